@@ -146,6 +146,7 @@ class Game:
 
 	def __init__(self, config: Config) -> None:
 		self.config = config
+		self._map_names_by_graph: dict[int | None, str | None] = {}  # graph vertex index: map name; see get_map_name_by_graph()
 
 	@property
 	def gamedata_path(self) -> Path | None:
@@ -183,7 +184,7 @@ class Game:
 		return self.config.game_config.localize(id, html_format, localized_only)
 
 	@classmethod
-	def iter_save_actor_objects(cls, save_file_path: str, actor_only = False) -> Iterator[dict]:
+	def iter_save_actor_objects(cls, save_file_path: str, actor_only = False) -> Iterator[Save.ObjectData]:
 		'iterates .sav file for actor object or belongs to actor objects'
 		gs = Save(save_file_path)
 		for chunk in gs.iter_chunks():
@@ -220,10 +221,14 @@ class Game:
 		return None
 
 	def get_map_name_by_graph(self, vertex_id: int | None) -> str | None:
-		'returns map name by graph vertex index'
+		'returns map name by graph vertex index; cached: game.graph file parsed once per vertex'
+		if vertex_id in self._map_names_by_graph:
+			return self._map_names_by_graph[vertex_id]
+		ret = None
 		if not vertex_id is None and (gg := GameGraph(self.gamegraph_file_path)):
 			# find game vertex by index
 			if (vertex := next(islice(gg.iter_vertexes(), vertex_id, vertex_id + 1))):  # get vertex by index
 				if (level := gg.get_level_by_id(vertex[2])):  # get level by id
-					return level[0]
-		return None
+					ret = level[0]
+		self._map_names_by_graph[vertex_id] = ret
+		return ret
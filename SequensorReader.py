@@ -4,12 +4,20 @@
 
 from typing import Literal, Self
 from struct import Struct
+from functools import lru_cache
+from contextlib import contextmanager
 
 
 class OutOfBoundException(Exception):
 	pass
 
 
+@lru_cache(maxsize=None)
+def get_struct(format: str) -> Struct:
+	'returns compiled Struct; cached by format'
+	return Struct(format)
+
+
 class SequensorReader:
 	'binary deserialization tool'
 
@@ -19,17 +27,25 @@ class SequensorReader:
 		'''
 		self.buff, self.byte_order = buff, byte_order
 		self.pos = 0
+		self.end = len(buff)  # read limit position; see push_limit()
+		self._ends: list[int] = []
 	
 	def read(self, format: str) -> tuple[int | float] | int | float:
 		'''
 		reads according to Struct format
 		format:	see struct help - Format Characters
 		'''
-		s = Struct(self.byte_order+format)
+		return self.read_struct(get_struct(self.byte_order+format))
+
+	def read_struct(self, s: Struct) -> tuple[int | float] | int | float:
+		'''
+		reads according to compiled Struct; use to avoid format parsing in loops
+		s:	Struct with byte order in format
+		'''
 		_size = s.size
-		if self.pos + _size > len(self.buff):
+		if self.pos + _size > self.end:
 			raise OutOfBoundException()
-		ret = s.unpack(self.buff[self.pos:self.pos+_size])
+		ret = s.unpack_from(self.buff, self.pos)
 		self.pos += _size
 		return ret[0] if len(ret) == 1 else ret
 
@@ -37,7 +53,7 @@ class SequensorReader:
 		'''
 		reads null-terminated string
 		'''
-		string_end_index = self.buff.find(b'\0', self.pos)
+		string_end_index = self.buff.find(b'\0', self.pos, self.end)
 		if string_end_index < 0:
 			raise OutOfBoundException()
 		ret = self.buff[self.pos:string_end_index].decode()
@@ -50,13 +66,13 @@ class SequensorReader:
 		size:	size to read, bytes; None - read until buffer end
 		'''
 		if size is None:
-			ret = self.buff[self.pos:]
+			ret = self.buff[self.pos:self.end]
 			if update_position:
-				self.pos = len(self.buff) + 1
+				self.pos = self.end + 1
 			return ret
-		ret = self.buff[self.pos:self.pos+size]
-		if len(ret) != size:
+		if self.pos + size > self.end:
 			raise OutOfBoundException()
+		ret = self.buff[self.pos:self.pos+size]
 		if update_position:
 			self.pos += size
 		return ret
@@ -64,17 +80,41 @@ class SequensorReader:
 	@property
 	def remain(self) -> int:
 		'returns remaining bytes count'
-		return len(self.buff) - self.pos
+		return self.end - self.pos
+
+	def push_limit(self, size: int) -> int:
+		'''
+		limits reading to size bytes from current position without buffer copy; restore with pop_limit()
+		returns limit end position
+		'''
+		if self.pos + size > self.end:
+			raise OutOfBoundException()
+		self._ends.append(self.end)
+		self.end = self.pos + size
+		return self.end
+
+	def pop_limit(self) -> Self:
+		'restores read limit before last push_limit()'
+		self.end = self._ends.pop()
+		return self
+
+	@contextmanager
+	def limit(self, size: int):
+		'push_limit() for with block; read limit restored on block exit, exception included'
+		end = self.push_limit(size)
+		try:
+			yield end
+		finally:
+			self.pop_limit()
 
 	def skip(self, format: str) -> Self:
 		'''
 		skip bytes according to Struct format
 		format:	see struct help - Format Characters
 		'''
-		s = Struct(format)
-		self.pos += s.size
+		self.pos += get_struct(format).size
 		return self
 
 	@staticmethod
 	def calc_len(format: str) -> int:
-		return Struct(format).size
+		return get_struct(format).size
@@ -13,7 +13,7 @@ from xml.dom.minidom import Element
 from xml.parsers.expat import ExpatError
 # stalker-tools import
 from ltx_tool import parse_ltx_file, LtxKind, get_filters_re_compiled, is_filters_re_match
-from xml_tool import iter_child_elements, get_child_by_id, get_child_element_values, xml_parse
+from xml_tool import iter_child_elements, get_child_by_id, get_children_by_id, get_child_element_values, xml_parse
 from paths import Paths
 from localization import Localization
 
@@ -294,6 +294,7 @@ if __name__ == '__main__':
 				dialog_xml_file_pah - dialog xml: configs/gameplay/dialog*.xml
 				text_xml_file_path - localization xml: configs/text/<LOCALIZATION>/st_dialog*.xml
 				'''
+				strings_by_id: dict[Element, dict[str, Element]] = {}  # localization <string_table>: <string> elements by id
 
 				def create_dialog_graph(dialog: Element, string_table: Element | None) -> 'graph | None':
 					'''
@@ -328,8 +329,10 @@ if __name__ == '__main__':
 
 						ret = ''
 						if string_table:
+							if (strings := strings_by_id.get(string_table)) is None:
+								strings_by_id[string_table] = strings = get_children_by_id(string_table, 'string')
 							for id in ids:
-								if id and (e := get_child_by_id(string_table, 'string', id)):
+								if id and (e := get_child_by_id(string_table, 'string', id, strings)):
 									ret += get_child_element_values(e, 'text', '\n')
 						elif loc.string_table:
 							# try find ids in localization string_table
@@ -13,6 +13,8 @@ from paths import Paths
 from xml.dom.minidom import parse, Element
 from io import BytesIO
 from base64 import b64encode
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
 from PIL.Image import open as image_open, Image
 
 
@@ -86,6 +88,24 @@ class IconsXmlDds:
 		return None
 
 
+def get_images_as_html_img(icons: tuple[IconsXmlDds, ...], ids: Iterable[str]) -> dict[str, str]:
+	'returns HTML <img> tags by id of found images; images searched in icons by order and encoded concurrently'
+	lock = Lock()  # .dds image lazy loads on first crop
+
+	def get_image_as_html(id: str) -> str | None:
+		with lock:
+			for x in icons:
+				if (image := x.get_image(id)):
+					break
+			else:
+				return None
+		return get_image_as_html_img(image)
+
+	ids = list(ids)
+	with ThreadPoolExecutor() as executor:
+		return {id: html for id, html in zip(ids, executor.map(get_image_as_html, ids)) if html}
+
+
 class UiNpcUnique(IconsXmlDds):
 	def __init__(self, gamedata_path: str) -> None:
 		paths = Paths(gamedata_path)
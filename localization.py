@@ -3,14 +3,14 @@
 # Stalker Xray game .xml localization files tool
 # Author: Stalker tools, 2023-2024
 
-from sys import stderr
+from sys import stderr, intern
 from os.path import basename, join
 from glob import glob
 from xml.dom.minidom import Document
 # stalker-tools import
 from ltx_tool import parse_ltx_file, LtxKind
 from paths import Paths
-from xml_tool import xml_parse, get_child_element_values
+from xml_tool import get_child_element_values, add_localization_dict_from_localization_xml_file
 
 
 class Localization:
@@ -28,6 +28,7 @@ class Localization:
 		# find string_table .xml files
 		self.string_table: dict[str, str] = {}  # localized strings: id, string
 		self.string_table_files_found: list[str] = []  # found localization files paths
+		self.string_table_files_added: set[str] = set()  # already parsed localization files paths
 		self._load_string_tables()
 
 	def _load_string_table_ltx_section(self):
@@ -73,16 +74,19 @@ class Localization:
 
 		for _string in _xml.getElementsByTagName('string'):
 			if (string_id := _string.getAttribute('id')):
-				self.string_table[string_id] = normalize_text(get_child_element_values(_string, 'text', '\n'))
+				self.string_table[intern(string_id)] = normalize_text(get_child_element_values(_string, 'text', '\n'))
 				ret = True
 		
 		return ret
 
 	def add_localization_xml_file(self, file_path: str):
+		if file_path in self.string_table_files_added:
+			return  # already parsed
+		self.string_table_files_added.add(file_path)
 		try:
-			if (_xml := xml_parse(file_path, self.paths.configs)):
-				if self.add_localization_xml(_xml):
-					self.string_table_files_found.append(file_path)
+			# streaming ElementTree parse: no DOM for large string tables
+			if add_localization_dict_from_localization_xml_file(self.string_table, self.paths.configs, file_path):
+				self.string_table_files_found.append(file_path)
 		except Exception as e:
 			print(f'Localization .xml file parse error: {file_path} {e}', file=stderr)
 
@@ -4,20 +4,28 @@
 # Author: Stalker tools, 2023-2024
 
 from typing import Iterable
-from os.path import join, abspath, sep
-from pathlib import Path
+from os.path import join, abspath, normpath, exists, sep
 
 
 class Paths:
 
+	__slots__ = ('gamedata', 'configs', '_gamedata_prefix', 'game', 'system_ltx', 'game_ltx', '_ui_textures_descr', '_ui_textures')
+
+	SEP_TRANSLATE = str.maketrans({'\\': sep})  # Xray to OS path separator
+
 	def __init__(self, gamedata_path: str) -> None:
 		self.gamedata = abspath(gamedata_path)
-		if (p := Path(join(self.gamedata, 'configs'))) and p.exists():
-			self.configs = p.absolute()
-		elif (p := Path(join(self.gamedata, 'config'))) and p.exists():
-			self.configs = p.absolute()
+		self._gamedata_prefix = join(self.gamedata, '')  # gamedata path with trailing separator
+		if exists(configs := join(self.gamedata, 'configs')) or exists(configs := join(self.gamedata, 'config')):
+			self.configs = configs  # gamedata is absolute already
 		else:
 			raise FileExistsError(f'Stalker configs path not exisists: {gamedata_path}')
+		# well-known paths
+		self.game = abspath(join(self.gamedata, '..'))  # game root path
+		self.system_ltx = join(self.configs, 'system.ltx')  # system.ltx file path
+		self.game_ltx = join(self.configs, 'game.ltx')  # game.ltx file path
+		self._ui_textures_descr: dict[str, str] = {}  # common name: UI textures .xml file path
+		self._ui_textures: dict[str, str] = {}  # common name: UI textures .dds file path
 
 	def __str__(self) -> str:
 		return f'Paths({self.gamedata})'
@@ -26,37 +34,25 @@ class Paths:
 	def join(cls, *paths: Iterable[str]) -> str:
 		'cross-platform path join'
 		if sep != '\\':
-			return join(*(x.replace('\\', sep) for x in paths))
+			return join(*(x.translate(cls.SEP_TRANSLATE) for x in paths))
 		return join(*paths)
 
-	# Well-known paths
-
-	@property
-	def game(self) -> str:
-		'returns game root path'
-		return abspath(join(self.gamedata, '..'))
-
-	@property
-	def system_ltx(self) -> str:
-		'returns system.ltx file path'
-		return join(self.configs, 'system.ltx')
-
-	@property
-	def game_ltx(self) -> str:
-		'returns game.ltx file path'
-		return join(self.configs, 'game.ltx')
-
 	def relative(self, path: str) -> str:
-		'return relative path to gamedata'
-		p = Path(path)
-		if not p.is_relative_to(self.gamedata):
-			return path
-		return str(p.relative_to(self.gamedata))
+		'return relative path to gamedata; path outside of gamedata returned as is'
+		if (normalized := normpath(path)) == self.gamedata:
+			return '.'
+		if normalized.startswith(self._gamedata_prefix):  # prefix ends with separator: not sibling path
+			return normalized[len(self._gamedata_prefix):]
+		return path
 
 	def ui_textures_descr(self, common_name: str) -> str:
 		'return UI textures .xml file path: <gamedata path>/configs/ui/textures_descr/.xml'
-		return join(self.configs, 'ui', 'textures_descr', f'{common_name}.xml')
+		if (ret := self._ui_textures_descr.get(common_name)) is None:
+			self._ui_textures_descr[common_name] = ret = join(self.configs, 'ui', 'textures_descr', f'{common_name}.xml')
+		return ret
 
 	def ui_textures(self, common_name: str) -> str:
 		'return UI textures .dds file path: <gamedata path>/textures/ui/.dds'
-		return join(self.gamedata, 'textures', 'ui', f'{common_name}.dds')
+		if (ret := self._ui_textures.get(common_name)) is None:
+			self._ui_textures[common_name] = ret = join(self.gamedata, 'textures', 'ui', f'{common_name}.dds')
+		return ret
@@ -3,31 +3,44 @@
 # Stalker Xray game human profiles tool
 # Author: Stalker tools, 2023-2024
 
-from sys import stderr
+from sys import stderr, stdout
+import csv
+from collections.abc import Iterable, Callable
 from os.path import join, basename
+from weakref import WeakKeyDictionary
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from ltx_tool import parse_ltx_file, LtxKind
-from xml.dom.minidom import parseString
-from xml_tool import xml_preprocessor, get_child_element_values
-from xml.dom.minidom import Element
+from io import BytesIO
+from xml.etree.ElementTree import iterparse, Element
+from xml_tool import xml_preprocessor, get_child_element_texts
 # stalker-tools import
 from dialog_tool import get_dialogs_and_add_localization, create_dialog_graph, get_svg, GraphEngineNotSupported, SvgException
-from icon_tools import UiNpcUnique, UiIconstotal, get_image_as_html_img
+from icon_tools import UiNpcUnique, UiIconstotal, get_images_as_html_img
 from paths import Paths
 from localization import Localization
 
 
+CSV_QUOTE_TRANSLATE = str.maketrans({'"': '\''})  # csv cell text: replace double quotes
+# brochure profile card html; fields: index, name, icon, community, rank, reputation, money, bio
+BROCHURE_ITEM_TEMPLATE = '<div class="item"><div style="display:flex;">{index}&nbsp;&nbsp;&nbsp;<span class="item-header">{name}</span></div>' \
+	'<div style="display:flex;">{icon}<br/>&nbsp;Группировка: {community}<br/>&nbsp;Ранг: {rank}<br/>&nbsp;Репутация: {reputation}<br/>&nbsp;{money}</div>' \
+	'<div>{bio}</div></div>\n'
+
+
 def get_profiles(system_ltx_file_path: str) -> tuple[list[str], list[str]] | tuple[None, None]:
 	'returns files and specific_characters_files .xml from system.ltx includes: [profiles] files, specific_characters_files'
 	files = specific_characters_files = None
 	try:
-		for x in parse_ltx_file(system_ltx_file_path, follow_includes=True):
-			match x:
-				case (LtxKind.LET, _, 'profiles', 'files', files):
-					if files and specific_characters_files:
-						return files, specific_characters_files
-				case (LtxKind.LET, _, 'profiles', 'specific_characters_files', specific_characters_files):
-					if files and specific_characters_files:
-						return files, specific_characters_files
+		# close parser (and its open include files) as soon as both values are found
+		with closing(parse_ltx_file(system_ltx_file_path, follow_includes=True)) as ltx:
+			for x in ltx:
+				match x:
+					case (LtxKind.LET, _, 'profiles', 'files', files): pass
+					case (LtxKind.LET, _, 'profiles', 'specific_characters_files', specific_characters_files): pass
+					case _: continue
+				if files and specific_characters_files:
+					return files, specific_characters_files
 	except: pass
 	return files, specific_characters_files
 
@@ -46,21 +59,51 @@ def get_profiles_and_add_localization(paths: Paths, loc: Localization, verbose =
 	# ToDo: Add processing of .ltx [string_table] section
 
 	specific_characters_dict = {}
-	failed_include_file_paths = []
-	for specific_characters_file in specific_characters_files:
-		xml_file_path = join(paths.configs, 'gameplay', f'{specific_characters_file}.xml')
+	failed_include_file_paths = set()  # shared by worker threads: xml_preprocessor() checks and adds it under lock
+
+	def preprocess_and_parse(xml_file_path: str) -> list[Element] | None:
+		'returns specific_character XML elements of profiles .xml file; None if file not found'
 		try:
 			buff = xml_preprocessor(xml_file_path, paths.configs, failed_include_file_paths=failed_include_file_paths)
 		except FileNotFoundError:
-			print(f'profile file not found: {xml_file_path}', file=stderr)
-			continue
-		if (_xml := parseString(buff)):
-			specific_character_list = _xml.getElementsByTagName('specific_character')
-			for specific_character in specific_character_list:
-				specific_characters_dict[specific_character.getAttribute('id')] = specific_character
+			return None
+		# streaming parse: finished elements detached from parent, so only specific_character elements outlive the parser
+		ret, parents, specific_character_depth = [], [], 0
+		for event, e in iterparse(BytesIO(buff), ('start', 'end')):
+			if event == 'start':
+				if e.tag == 'specific_character':
+					specific_character_depth += 1
+				parents.append(e)
+				continue
+			parents.pop()
+			if e.tag == 'specific_character':
+				specific_character_depth -= 1
+				ret.append(e)
+			if not specific_character_depth and parents:
+				parents[-1].remove(e)
+		return ret
+
+	# read and parse profiles .xml files concurrently; results are merged in files order
+	xml_file_paths = [join(paths.configs, 'gameplay', f'{x}.xml') for x in specific_characters_files]
+	with ThreadPoolExecutor() as executor:
+		for xml_file_path, specific_characters in zip(xml_file_paths, executor.map(preprocess_and_parse, xml_file_paths)):
+			if specific_characters is None:
+				print(f'profile file not found: {xml_file_path}', file=stderr)
+				continue
+			for specific_character in specific_characters:
+				specific_characters_dict[specific_character.get('id', '')] = specific_character
 
 	return specific_characters_dict
 
+_child_element_values_cache: WeakKeyDictionary[Element, dict[tuple[str, str | None], list[str] | str]] = WeakKeyDictionary()
+
+def get_child_element_values_cached(element: Element, child_name: str, join_str: str | None = None) -> list[str] | str:
+	'get_child_element_texts() cached per XML element'
+	values = _child_element_values_cache.setdefault(element, {})
+	if (key := (child_name, join_str)) not in values:
+		values[key] = get_child_element_texts(element, child_name, join_str)
+	return values[key]
+
 
 if __name__ == '__main__':
 	import argparse
@@ -90,32 +133,73 @@ if __name__ == '__main__':
 
 		args = parse_args()
 
-		def _get_element_values(loc: Localization | None, element: Element, element_name: str) -> str | int:
-			if element_name == 'id':
-				return element.getAttribute('id')
-			if (buff := get_child_element_values(element, element_name, '\n')):
-				if loc:
-					if (buff2 := loc.string_table.get(buff)):
-						return buff2
-					if element_name =='name':
-						# enforce localization process
-						if loc.try_find_and_add(buff):
-							if (buff2 := loc.string_table.get(buff)):
-								return buff2
-				if element_name == 'reputation':
-					try:
-						return int(buff)
-					except: pass
+		def write_html(text: str):
+			'writes encoded text directly to stdout binary buffer; pending print() output must be flushed before'
+			stdout.buffer.write(text.encode(stdout.encoding))
+
+		def _get_element_id(loc: Localization | None, element: Element, element_name: str) -> str:
+			return element.get('id', '')
+
+		def _get_element_text(loc: Localization | None, element: Element, element_name: str) -> str:
+			'returns child element text; localized if loc'
+			if (buff := get_child_element_values_cached(element, element_name, '\n')):
+				if loc and (buff2 := loc.string_table.get(buff)):
+					return buff2
 				return buff
 			return ''
 
-		def _get_element_values_sort(loc: Localization | None, element: Element, element_name: str):
-			ret = _get_element_values(loc if element_name == 'name' else None, element, element_name)
+		localization_tried_ids: set[str] = set()
+
+		def _get_element_name(loc: Localization | None, element: Element, element_name: str) -> str:
+			'returns child element text; localized if loc with localization .xml files search'
+			if loc and (buff := get_child_element_values_cached(element, element_name, '\n')) and not loc.string_table.get(buff) \
+					and buff not in localization_tried_ids:
+				# enforce localization process; scan localization .xml files at most once per id
+				localization_tried_ids.add(buff)
+				if loc.try_find_and_add(buff) and (buff2 := loc.string_table.get(buff)):
+					return buff2
+			return _get_element_text(loc, element, element_name)
+
+		def _get_element_int(loc: Localization | None, element: Element, element_name: str) -> str | int:
+			'returns child element text as int if not localized'
+			if (buff := get_child_element_values_cached(element, element_name, '\n')) and not (loc and loc.string_table.get(buff)):
+				try:
+					return int(buff)
+				except ValueError: pass
+			return _get_element_text(loc, element, element_name)
+
+		ELEMENT_VALUE_GETTERS = {'id': _get_element_id, 'name': _get_element_name, 'reputation': _get_element_int}
+
+		def _get_element_values(loc: Localization | None, element: Element, element_name: str) -> str | int:
+			return ELEMENT_VALUE_GETTERS.get(element_name, _get_element_text)(loc, element, element_name)
+
+		def get_sort_key(loc: Localization | None, element_name: str) -> Callable[[Element], str | int]:
+			'returns XML element sort key function specialized for sort element name'
 			match element_name:
-				case 'name': return (ret if ord(ret[0]) < 128 else ' '+ret) + element.getAttribute('id')
-				case 'reputation': return f'{ret:05}{_get_element_values(loc, element, "name")}'
-				case 'community' | 'bio': return ret + _get_element_values(loc, element, 'name')
-			return ret
+				case 'name':
+					def sort_key(element: Element) -> str:
+						ret = _get_element_values(loc, element, 'name')
+						return (ret if ord(ret[0]) < 128 else ' '+ret) + element.get('id', '')
+				case 'reputation':
+					def sort_key(element: Element) -> str:
+						return f'{_get_element_values(None, element, "reputation"):05}{_get_element_values(loc, element, "name")}'
+				case 'community' | 'bio':
+					def sort_key(element: Element) -> str:
+						return _get_element_values(None, element, element_name) + _get_element_values(loc, element, 'name')
+				case _:
+					def sort_key(element: Element) -> str | int:
+						return _get_element_values(None, element, element_name)
+			return sort_key
+
+		def get_sorted_profiles(loc: Localization, specific_characters: Iterable[Element], element_names: tuple[str],
+				localized_element_names: tuple[str]) -> list[tuple[Element, dict[str, str | int]]]:
+			'returns profiles sorted by sort field with XML element values read once per profile: [(XML element, {element name: value})]'
+			sort_key = get_sort_key(loc, args.sort_field)
+			specific_characters = list(specific_characters)
+			keys = [sort_key(x) for x in specific_characters]  # sort key built once per profile
+			order = sorted(range(len(specific_characters)), key=keys.__getitem__)
+			return [(x, {name: _get_element_values(loc if name in localized_element_names else None, x, name) for name in element_names})
+				for x in (specific_characters[i] for i in order)]
 
 		def analyse(gamedata_path: str):
 
@@ -139,17 +223,14 @@ if __name__ == '__main__':
 
 			STYLE = 'style="text-align: left;"'
 
-			def add_element_values(element_name: str, loc: Localization | None = None, is_last = False, convert = None):
-				'print table cell from XML element'
-				buff = _get_element_values(loc, specific_character, element_name)
+			def get_element_cell(values: dict[str, str | int], element_name: str, convert = None) -> str | int:
+				'returns table cell from profile values'
+				buff = values[element_name]
 				if args.output_format != 'c':
-					print(f'<th {STYLE}>{convert(buff) if convert else buff}</th>')
-				else:
-					if type(buff) is str:
-						if '"' in buff:
-							buff = buff.replace('"', '\'')
-						buff = '"' + buff + '"'
-					print(buff, end='' if is_last else ',')
+					return f'<th {STYLE}>{convert(buff) if convert else buff}</th>'
+				if isinstance(buff, str):
+					return buff.translate(CSV_QUOTE_TRANSLATE)
+				return buff
 
 			def _create_dialog_graph(dialog_id: str):
 				if (dialog := dialogs_dict.get(dialog_id)):
@@ -161,6 +242,7 @@ if __name__ == '__main__':
 				dialogs_dict = get_dialogs_and_add_localization(paths, loc, args.output_format != 'c')
 
 			FILELD_NAMES = ('No', 'Id', 'Name', 'Icon', 'Class', 'Community', 'Reputation', 'Bio')
+			TABLE_ELEMENT_NAMES = ('id', 'name', 'icon', 'class', 'community', 'reputation', 'bio')
 
 			def print_table_header():
 				if args.output_format != 'c':
@@ -178,38 +260,34 @@ if __name__ == '__main__':
 			if specific_characters_dict:
 
 				def get_icon(id: str | None) -> str | None:
-					if id and ui_npc_unique:
-						if (image := ui_npc_unique.get_image(id)) or (image := ui_iconstotal.get_image(id)):
-							return f'{id}<br/>{get_image_as_html_img(image)}'
+					if id and (html := icons_html.get(id)):
+						return f'{id}<br/>{html}'
 					return id
 
-				ui_npc_unique = UiNpcUnique(gamedata_path) if args.output_format != 'c' else None
-				ui_iconstotal = UiIconstotal(gamedata_path) if args.output_format != 'c' else None
-
-				for index, specific_character in enumerate(sorted(specific_characters_dict.values(), key=lambda x:
-						_get_element_values_sort(loc, x, args.sort_field))):
-					match args.output_format:
-						case 'h' | 'd':
-							if args.output_format == 'd':
-								print_table_header()
-							print('<tr>')
-							print(f'<th>{index + 1}</th>')
-						case 'c':
-							print(f'{index + 1}', end=',')
-					add_element_values('id')
-					add_element_values('name', loc)
-					add_element_values('icon', convert=get_icon)
-					add_element_values('class')
-					add_element_values('community')
-					add_element_values('reputation')
-					add_element_values('bio', is_last=True)
-					print('</tr>' if args.output_format != 'c' else '')
+				profiles = get_sorted_profiles(loc, specific_characters_dict.values(), TABLE_ELEMENT_NAMES, ('name',))
+				# read and encode each used icon once
+				icons_html = get_images_as_html_img((UiNpcUnique(gamedata_path), UiIconstotal(gamedata_path)),
+					{x for _, values in profiles if (x := values['icon'])}) if args.output_format != 'c' else {}
+				# csv: quote text cells only
+				csv_writer = csv.writer(stdout, lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC) if args.output_format == 'c' else None
+				stdout.flush()
+
+				for index, (specific_character, values) in enumerate(profiles):
+					if args.output_format == 'd':
+						print_table_header()
+						stdout.flush()
+					# write table row at once
+					cells = [get_element_cell(values, x, get_icon if x == 'icon' else None) for x in TABLE_ELEMENT_NAMES]
+					if csv_writer:
+						csv_writer.writerow((index + 1, *cells))
+					else:
+						write_html('\n'.join(('<tr>', f'<th>{index + 1}</th>', *cells, '</tr>\n')))
 					if args.output_format == 'd':
 						print('</tbody></table>')
-						if (dialog_ids := get_child_element_values(specific_character, 'start_dialog')):
+						if (dialog_ids := get_child_element_values_cached(specific_character, 'start_dialog')):
 							for dialog_id in dialog_ids:
 								_create_dialog_graph(dialog_id)
-						if (dialog_ids := get_child_element_values(specific_character, 'actor_dialog')):
+						if (dialog_ids := get_child_element_values_cached(specific_character, 'actor_dialog')):
 							for dialog_id in dialog_ids:
 								_create_dialog_graph(dialog_id)
 			# print HTML footer
@@ -223,15 +301,12 @@ if __name__ == '__main__':
 			specific_characters_dict = get_profiles_and_add_localization(paths, loc)
 
 			def get_icon(id: str | None) -> str | None:
-				if id and ui_npc_unique:
-					if (image := ui_npc_unique.get_image(id)) or (image := ui_iconstotal.get_image(id)):
-						return get_image_as_html_img(image)
-				return id
+				return icons_html.get(id, id) if id else id
 
 			def get_money(specific_character: Element, prefix: str) -> str:
-				if (money := specific_character.getElementsByTagName('money')) and (money := money[0]):
-					_min, _max = money.getAttribute("min"), money.getAttribute("max")
-					return f'{prefix}: {_min}{"..."+_max if _min != _max else ""}{"..." if money.getAttribute("infinitive") != "0" else ""}'
+				if (money := specific_character.find('.//money')) is not None:
+					_min, _max = money.get('min', ''), money.get('max', '')
+					return f'{prefix}: {_min}{"..."+_max if _min != _max else ""}{"..." if money.get("infinitive", "") != "0" else ""}'
 				return ''
 
 			print(f'''<html><head>
@@ -242,18 +317,18 @@ if __name__ == '__main__':
 </style>
 </head><body>''')
 
-			ui_npc_unique = UiNpcUnique(gamedata_path) if args.output_format != 'c' else None
-			ui_iconstotal = UiIconstotal(gamedata_path) if args.output_format != 'c' else None
 			print(f'<div class="main">')
+			stdout.flush()
 			if specific_characters_dict:
-				index = 1
-				for specific_character in sorted(specific_characters_dict.values(), key=lambda x:
-						_get_element_values_sort(loc, x, args.sort_field)):
-					name = _get_element_values(loc, specific_character, 'name')
-					bio = _get_element_values(loc, specific_character, 'bio')
-					if not name.startswith('GENERATE_NAME'):
-						print(f'<div class="item"><div style="display:flex;">{index}&nbsp;&nbsp;&nbsp;<span class="item-header">{name}</span></div><div style="display:flex;">{get_icon(_get_element_values(None, specific_character, "icon"))}<br/>&nbsp;Группировка: {_get_element_values(loc, specific_character, "community")}<br/>&nbsp;Ранг: {_get_element_values(loc, specific_character, "rank")}<br/>&nbsp;Репутация: {_get_element_values(loc, specific_character, "reputation")}<br/>&nbsp;{get_money(specific_character, "Деньги")}</div><div>{bio}</div></div>')
-						index += 1
+				profiles = [(x, values) for x, values in get_sorted_profiles(loc, specific_characters_dict.values(),
+						('name', 'bio', 'icon', 'community', 'rank', 'reputation'), ('name', 'bio', 'community', 'rank', 'reputation'))
+					if not values['name'].startswith('GENERATE_NAME')]
+				# read and encode each used icon once
+				icons_html = get_images_as_html_img((UiNpcUnique(gamedata_path), UiIconstotal(gamedata_path)),
+					{x for _, values in profiles if (x := values['icon'])})
+				for index, (specific_character, values) in enumerate(profiles, 1):
+					write_html(BROCHURE_ITEM_TEMPLATE.format_map(values | {
+						'index': index, 'icon': get_icon(values['icon']), 'money': get_money(specific_character, 'Деньги')}))
 			print('</div>')
 			print('</body></html>')
 
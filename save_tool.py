@@ -5,12 +5,28 @@
 
 from typing import Iterator, Callable
 from enum import Enum
+from dataclasses import dataclass
+from functools import lru_cache
+from struct import Struct
+from re import compile, escape
 import lzo
+try:
+	from os import posix_fadvise, POSIX_FADV_SEQUENTIAL
+except ImportError:
+	posix_fadvise = None  # not POSIX OS
 # tools imports
 from ChunkReader import ChunkReader
 from SequensorReader import SequensorReader, OutOfBoundException
 
 
+# compiled little-endian net packet formats
+S_B, S_BB, S_BBB, S_4B = Struct('<B'), Struct('<BB'), Struct('<BBB'), Struct('<BBBB')
+S_H, S_5H, S_HF = Struct('<H'), Struct('<HHHHH'), Struct('<Hf')
+S_I, S_II, S_III = Struct('<I'), Struct('<II'), Struct('<III')
+S_F, S_FFF, S_FIB, S_4FBBB, S_B19F = Struct('<f'), Struct('<fff'), Struct('<fIB'), Struct('<ffffBBB'), Struct('<B' + 'f' * 19)
+S_QFF = Struct('<Qff')
+
+
 save_file_path = '/home/vika/.wine/drive_c/Program Files (x86)/GSC World Publishing/S.T.A.L.K.E.R/_data/savedgames/1.sav'
 
 
@@ -41,7 +57,7 @@ class Save:
 	class AlifeChunk(Chunk):
 
 		def iter_data(self) -> Iterator[dict[str, str]]:
-			if self.size == 4 and (version := self.sr.read('I')) and version >= 2:
+			if self.size == 4 and (version := self.sr.read_struct(S_I)) and version >= 2:
 				yield {'version': version}
 
 
@@ -49,7 +65,8 @@ class Save:
 
 		def iter_data(self) -> Iterator[dict[str, str]]:
 			if self.size == 16:
-				yield dict(zip(('time_id', 'time_factor', 'normal_time_factor'), self.sr.read('Qff')))
+				time_id, time_factor, normal_time_factor = self.sr.read_struct(S_QFF)
+				yield {'time_id': time_id, 'time_factor': time_factor, 'normal_time_factor': normal_time_factor}
 
 
 	class SpawnChunk(Chunk):
@@ -62,51 +79,137 @@ class Save:
 				match type:
 					case 0:
 						sr = SequensorReader(bytes)
-						yield dict(zip(('subchunk_type', 'spawn_name', 'GUID'), (0, sr.read_string(), sr.read_bytes(16))))
+						yield {'subchunk_type': 0, 'spawn_name': sr.read_string(), 'GUID': sr.read_bytes(16)}
 					case 1:
 						# spawn graph vertices
 						sr = SequensorReader(bytes)
-						yield dict(zip(('subchunk_type', 'vertex_id',), (1, sr.read('I'))))
+						yield {'subchunk_type': 1, 'vertex_id': sr.read_struct(S_I)}
+
+
+	@dataclass(slots=True)
+	class ObjectData:
+		'object from spawn and update net packets; dict-like read access to set (not None) fields'
+		# spawn: CSE_Abstract::Spawn_Read
+		name: str | None = None
+		name_replace: str | None = None
+		game_id: int | None = None
+		rp: int | None = None
+		position: tuple[float, float, float] | None = None
+		angle: tuple[float, float, float] | None = None
+		respawn_time: int | None = None
+		id: int | None = None
+		id_parent: int | None = None
+		id_phantom: int | None = None
+		flags: int | None = None
+		version: int | None = None
+		script_version: int | None = None
+		client_data: bytes | None = None
+		spawn_id: int | None = None
+		# spawn: STATE_Read
+		graph_id: int | None = None
+		distance: float | None = None
+		node_id: int | None = None
+		spawn_control: str | None = None
+		ini_string: str | None = None
+		story_id: int | None = None
+		spawn_story_id: int | None = None
+		visual_name: str | None = None
+		team: int | None = None
+		squad: int | None = None
+		group: int | None = None
+		health: float | None = None
+		# update: UPDATE_Read
+		timestamp: int | None = None
+		model: float | None = None
+		yaw: float | None = None
+		pitch: float | None = None
+		roll: float | None = None
+		mstate: int | None = None
+		accel: tuple[int, float] | None = None
+		velocity: tuple[int, float] | None = None
+		radiation: float | None = None
+		weapon: int | None = None
+		num_items: int | None = None
+		elapsed: int | None = None
+
+		def get(self, key: str, default = None):
+			return default if (value := getattr(self, key, None)) is None else value
+
+		def __getitem__(self, key: str):
+			if (value := getattr(self, key, None)) is None:
+				raise KeyError(key)
+			return value
+
+		def keys(self) -> Iterator[str]:
+			'set fields names in declaration order (not in read order as former dict did)'
+			return (x for x in self.__slots__ if getattr(self, x) is not None)
+
+		def update(self, values: dict):
+			for key, value in values.items():
+				setattr(self, key, value)
 
 
 	class ObjectChunk(Chunk):
 		'chunk contains subchunks'
 
-		def iter_data(self) -> Iterator[dict[str, str]]:
+		def get_net_packets(self) -> list[tuple[int, int, int, int]]:
+			'''returns objects net packets positions in one pass over sizes only:
+			[(spawn packet position, spawn packet size, update packet position, update packet size)]
+			'''
+			# CALifeObjectRegistry::load
+			sr, ret = SequensorReader(self.sr.buff), []
+			for _ in range(sr.read_struct(S_I)):  # subchunks count
+				net_packet_len_s = sr.read_struct(S_H)
+				pos_s = sr.pos
+				sr.pos += net_packet_len_s
+				net_packet_len_u = sr.read_struct(S_H)
+				ret.append((pos_s, net_packet_len_s, sr.pos, net_packet_len_u))
+				sr.pos += net_packet_len_u
+			return ret
+
+		def iter_data(self) -> Iterator['Save.ObjectData']:
 			# iterate subchunks: each subchunk contains spawn and update net packets
 			# CALifeObjectRegistry::load
-			count = self.sr.read('I')  # subchunks count
-			for i in range(count):
-				data = {}
-				# read spawn net packet
-				# CALifeObjectRegistry::get_object
-				# spawn
-				net_packet_len_s = self.sr.read('H')
-				sr = SequensorReader(self.sr.read_bytes(net_packet_len_s))
-				id_s, name_s = sr.read('H'), sr.read_string()  # M_SPAWN=1, section name
+			for net_packets in self.get_net_packets():
+				yield self.read_object(*net_packets)
+
+		def parse_all(self) -> list['Save.ObjectData']:
+			'returns all objects at once; faster than iter_data() when whole chunk processed'
+			return [self.read_object(*x) for x in self.get_net_packets()]
+
+		def read_object(self, pos_s: int, net_packet_len_s: int, pos_u: int, net_packet_len_u: int) -> 'Save.ObjectData':
+			'reads object from spawn and update net packets; see get_net_packets()'
+			sr = self.sr  # net packets read in place with read limit
+			data = Save.ObjectData()
+			version = None
+			# read spawn net packet
+			# CALifeObjectRegistry::get_object
+			# spawn
+			sr.pos = pos_s
+			with sr.limit(net_packet_len_s):
+				id_s, name_s = sr.read_struct(S_H), sr.read_string()  # M_SPAWN=1, section name
 				# F_entity_Create(name_s)
 				# CSE_Abstract::Spawn_Read
 				# generic
-				data['name'] = name_s
-				data['name_replace'] = sr.read_string()
-				data['game_id'], data['rp'] = sr.read('BB')
-				data['position'] = sr.read('fff')
-				data['angle'] = sr.read('fff')
-				data.update(dict(zip(('respawn_time', 'id', 'id_parent', 'id_phantom', 'flags'), sr.read('HHHHH'))))
-				if data['flags'] & 0b10_0000:  # M_SPAWN_VERSION
-					version = sr.read('H')
-					data['version'] = version
+				data.name = name_s
+				data.name_replace = sr.read_string()
+				data.game_id, data.rp = sr.read_struct(S_BB)
+				data.position = sr.read_struct(S_FFF)
+				data.angle = sr.read_struct(S_FFF)
+				data.respawn_time, data.id, data.id_parent, data.id_phantom, data.flags = sr.read_struct(S_5H)
+				if data.flags & 0b10_0000:  # M_SPAWN_VERSION
+					version = sr.read_struct(S_H)
+					data.version = version
 					if not version:
-						yield data
-						continue
+						return data
 					if version > 69:
-						data['script_version'] = sr.read('H')
+						data.script_version = sr.read_struct(S_H)
 					# read specific data
 					if version > 70:
-						if (client_data_size := sr.read('H') if version > 93 else sr.read('B')):
-							data['client_data'] = sr.read_bytes(client_data_size)
+						if (client_data_size := sr.read_struct(S_H) if version > 93 else sr.read_struct(S_B)):
+							data.client_data = sr.read_bytes(client_data_size)
 					if version > 79:
-						data['spawn_id'] = sr.read('H')
+						data.spawn_id = sr.read_struct(S_H)
 					# if version < 112:
 					# 	if version > 82:
 					# 		sr.read('f')
@@ -116,113 +219,12 @@ class Save:
 					# 		sr.read('IIQ')
 					# 	if version > 84:
 					# 		sr.read('QQ')
-					size = sr.read('H')
+					size = sr.read_struct(S_H)
 					# STATE_Read
 
 
 					if name_s == 'actor':
-						# CSE_ALifeCreatureActor::STATE_Read
-						# CSE_ALifeCreatureAbstract::STATE_Read
-						# CSE_ALifeDynamicObjectVisual::STATE_Read
-						# CSE_ALifeDynamicObject::STATE_Read
-						# CSE_ALifeObject::STATE_Read
-						if version >= 1:
-							if version > 24:
-								if version < 83:
-									sr.read('f')  # m_spawn_probability
-							else:
-								sr.read('B')  # m_spawn_probability
-							if version < 83:
-								sr.read('I')
-							if version < 4:
-								sr.read('H')
-							data['graph_id'], data['distance'] = sr.read('Hf')
-						if version >= 4:
-							sr.read('I')  # is direct control
-						if version >= 8:
-							data['node_id'] = sr.read('I')
-						if version > 22 and version <= 79:
-							data['spawn_id'] = sr.read('H')
-						if version > 23 and version < 84:
-							data['spawn_control'] = sr.read_string()
-						if version > 49:
-							sr.read('I')
-						if version > 57:
-							data['ini_string'] = sr.read_string()
-						if version > 61:
-							data['story_id'] = sr.read('I')
-						if version > 111:
-							data['spawn_story_id'] = sr.read('I')
-
-						# CSE_ALifeDynamicObjectVisual::STATE_Read
-						if version > 31:
-							# CSE_Visual::visual_read
-							data['visual_name'] = sr.read_string()  # visual name
-							if version > 103:
-								sr.read('B')  # flags
-
-						# CSE_ALifeCreatureAbstract::STATE_Read
-						data.update(dict(zip(('team', 'squad', 'group'), sr.read('BBB'))))
-
-						if version > 18:
-							data['health'] = sr.read('f')
-						if version < 115:
-							data['health'] /= 100.0
-
-						# if version > 87:
-						# 	load_data m_dynamic_out_restrictions xr_vector<u16>
-						# 	load_data m_dynamic_in_restrictions  xr_vector<u16>
-
-						# if version > 94:
-						# 	killer_id = sr.read('H')
-
-						# if version > 115:
-						# 	game_death_time = sr.read('Q')
-
-						# CSE_ALifeTraderAbstract::STATE_Read
-						# if version < 108:
-						# 	sr.read('I')
-
-						# if version > 62:
-						# 	money = sr.read('I')
-
-						# if version > 75 and version < 98:
-						# 	sr.read('i')  # CSpecificCharacter::IndexToId
-						# elif version >= 98:
-						# 	specific_character = sr.read_string()
-
-						# if version > 77:
-						# 	trader_flags = sr.read('I')
-
-						# if version > 81 and version < 96:
-						# 	sr.read('i')  # CCharacterInfo::IndexToId
-						# elif version > 95:
-						# 	character_profile = sr.read_string()
-
-						# if version > 85:
-						# 	community_index = sr.read('i')
-
-						# if version > 86:
-						# 	rank, reputation = sr.read('ii')
-
-						# if version > 104:
-						# 	character_name
-
-						# # CSE_ALifeCreatureActor::STATE_Read
-						# if version > 91:
-						#	# CSE_PHSkeleton::STATE_Read
-						#	startup_animation = sr.read_string()
-						#	flags, source_id = sr.read('BH')
-						#	if flags & (1 << 2):  # flSavedData
-						#		# SPHBonesData::net_Load
-						# 		bones_mask, root_bone = sr.read('QH')
-						# 		sr.read('fff')
-						# 		sr.read('fff')
-						# 		bones_number = sr.read('H')
-						# 		for i in range(bones_number):
-						# 			sr.read('BBB')  # quaternion, quaternion, enabled
-						# if version > 88:
-						# 	holder_ID = sr.read('H')
+						data.update(Objects.State.CSE_ALifeCreatureActor(sr, version))
 
 					# CSE_ALifeItem::STATE_Read
 					# if ((m_tClassID == CLSID_OBJECT_W_BINOCULAR) && (m_wVersion < 37)) {
@@ -233,18 +235,26 @@ class Save:
 					# CSE_ALifeInventoryItem::STATE_Read
 					# if version > 52:
 					# 	condition = sr.read('f')
-				# read update net packet
-				net_packet_len_u = self.sr.read('H')
-				sr = SequensorReader(self.sr.read_bytes(net_packet_len_u))
-				id_u = sr.read('H')#, sr.read_bytes()  # M_UPDATE=0, buffer
+			# read update net packet
+			sr.pos = pos_u
+			with sr.limit(net_packet_len_u):
+				id_u = sr.read_struct(S_H)#, sr.read_bytes()  # M_UPDATE=0, buffer
 				# id_u, buff_u = sr.read('H')#, sr.read_bytes()  # M_UPDATE=0, buffer
 				# print(f'\t\tnet_packet {i:05} len={net_packet_len_s:05}/{net_packet_len_u:05} name={name_s:^15} repl={name_replace:^19} {game_id=} {rp=} pos=({','.join(f'{x:.0f}' for x in position)}) angle=({','.join(f'{x:.0f}' for x in angle)}) {respawn_time=} {id=} {version=} {flags=:b}{f' id_parent={id_parent}' if id_parent != 0xffff else ''}{f' id_phantom={id_phantom}' if id_phantom != 0xffff else ''}')
 				# print(buff_u.hex())
 				# print(buff_u.decode('windows-1251', errors='replace').replace('\n', '').replace('\r', ''))
 				if (update := Objects.get_update(name_s)):
 					data.update(update(sr, version))
-				yield data
+			return data
+
 
+	# chunk class by chunk type; REGISTRY and SCRIPT_VARS chunks are skipped
+	CHUNK_CLASSES = {
+		ChunkTypes.ALIFE.value: AlifeChunk,
+		ChunkTypes.GAME_TIME.value: GameTimeChunk,
+		ChunkTypes.SPAWN.value: SpawnChunk,
+		ChunkTypes.OBJECT.value: ObjectChunk,
+		}
 
 	def __init__(self, file_path: str) -> None:
 		self.file_path = file_path
@@ -253,48 +263,49 @@ class Save:
 	def _read_save_file(self) -> SequensorReader:
 		'read and decompress .sav file'
 		with open(self.file_path, 'rb') as f:
-			# read magic & version
-			sr = SequensorReader(f.read())
-			magic, version = sr.read('II')
+			if posix_fadvise:
+				# whole file read sequentially: let OS read ahead
+				posix_fadvise(f.fileno(), 0, 0, POSIX_FADV_SEQUENTIAL)
+			# read magic & version & unpacked length header only
+			sr = SequensorReader(f.read(S_III.size))
+			magic, version = sr.read_struct(S_II)
 			if magic != 0xffffffff:
 				return None
 			if version < 2:
 				return None
-			unpacked_len = sr.read('I')
+			unpacked_len = sr.read_struct(S_I)
 			# print(f'{magic=:X} {version=} {unpacked_len=}')
-			# decompress without lzo header and use decompressed buffer as chunks
-			return SequensorReader(lzo.decompress(sr.read_bytes(), False, unpacked_len, algorithm='LZO1X'))
+			# decompress rest of file without lzo header and use decompressed buffer as chunks
+			# compressed data read straight into bytes for lzo: no copy of whole file buffer slice
+			return SequensorReader(lzo.decompress(f.read(), False, unpacked_len, algorithm='LZO1X'))
 
 	def iter_chunks(self) -> Iterator[Chunk]:
 		if self.sr:
 			self.sr.pos = 0
 			while self.sr.pos < len(self.sr.buff):
-				type, size = self.sr.read('II')
+				type, size = self.sr.read_struct(S_II)
 				pos = self.sr.pos
 				buff = self.sr.read_bytes(size)
 				# print(f'{type=}, {size=}')
-				match type:
-					case self.ChunkTypes.ALIFE.value:
-						chunk = self.AlifeChunk(type, pos, buff)
-						yield chunk
-					case self.ChunkTypes.GAME_TIME.value:
-						chunk = self.GameTimeChunk(type, pos, buff)
-						yield chunk
-					case self.ChunkTypes.SPAWN.value:
-						chunk = self.SpawnChunk(type, pos, buff)
-						yield chunk
-					case self.ChunkTypes.OBJECT.value:
-						chunk = self.ObjectChunk(type, pos, buff)
-						yield chunk
-					case self.ChunkTypes.REGISTRY.value:
-						pass
-					case self.ChunkTypes.SCRIPT_VARS.value:
-						pass
+				if (chunk_class := self.CHUNK_CLASSES.get(type)):
+					yield chunk_class(type, pos, buff)
 
 
 class Objects:
 
+	@staticmethod
+	@lru_cache(maxsize=None)
 	def get_update(name: str) -> Callable | None:
+		'returns update net packet reader by object section name; see NAMES. Cached since saves have few distinct names'
+		if (update := Objects.NAMES_EXACT.get(name)):
+			return update
+		if Objects.NAMES_PREFIX_RE and (m := Objects.NAMES_PREFIX_RE.match(name)):
+			return Objects.NAMES_PREFIX_UPDATES[m.lastindex - 1]
+		return None
+
+	@staticmethod
+	def _find_update(name: str) -> Callable | None:
+		'returns update net packet reader by object section name; linear search in NAMES'
 		for k, v in Objects.NAMES.items():
 			for _name in v:
 				if _name.endswith('*'):
@@ -304,51 +315,178 @@ class Objects:
 					return k
 		return None
 
+	class State:
+
+		@classmethod
+		def CSE_ALifeCreatureActor(cls, sr: SequensorReader, version: int) -> dict:
+			'reads actor spawn net packet state data'
+			ret = {}
+			ops, health_divisor = cls.get_actor_state_ops(version)
+			for s, names in ops:
+				value = sr.read_struct(s) if s else sr.read_string()
+				if len(names) == 1:
+					ret[names[0]] = value
+				elif names:
+					for name, x in zip(names, value):
+						ret[name] = x
+			if health_divisor:
+				ret['health'] /= health_divisor
+			return ret
+
+		@staticmethod
+		@lru_cache(maxsize=None)
+		def get_actor_state_ops(version: int) -> tuple[tuple[tuple[Struct | None, tuple[str, ...]], ...], float | None]:
+			'''returns actor STATE_Read operations for version: (Struct or None for string, value names to store), health divisor;
+			version checks done once per version instead of per object'''
+			ops = []
+			# CSE_ALifeCreatureActor::STATE_Read
+			# CSE_ALifeCreatureAbstract::STATE_Read
+			# CSE_ALifeDynamicObjectVisual::STATE_Read
+			# CSE_ALifeDynamicObject::STATE_Read
+			# CSE_ALifeObject::STATE_Read
+			if version >= 1:
+				if version > 24:
+					if version < 83:
+						ops.append((S_F, ()))  # m_spawn_probability
+				else:
+					ops.append((S_B, ()))  # m_spawn_probability
+				if version < 83:
+					ops.append((S_I, ()))
+				if version < 4:
+					ops.append((S_H, ()))
+				ops.append((S_HF, ('graph_id', 'distance')))
+			if version >= 4:
+				ops.append((S_I, ()))  # is direct control
+			if version >= 8:
+				ops.append((S_I, ('node_id',)))
+			if version > 22 and version <= 79:
+				ops.append((S_H, ('spawn_id',)))
+			if version > 23 and version < 84:
+				ops.append((None, ('spawn_control',)))
+			if version > 49:
+				ops.append((S_I, ()))
+			if version > 57:
+				ops.append((None, ('ini_string',)))
+			if version > 61:
+				ops.append((S_I, ('story_id',)))
+			if version > 111:
+				ops.append((S_I, ('spawn_story_id',)))
+
+			# CSE_ALifeDynamicObjectVisual::STATE_Read
+			if version > 31:
+				# CSE_Visual::visual_read
+				ops.append((None, ('visual_name',)))  # visual name
+				if version > 103:
+					ops.append((S_B, ()))  # flags
+
+			# CSE_ALifeCreatureAbstract::STATE_Read
+			ops.append((S_BBB, ('team', 'squad', 'group')))
+
+			if version > 18:
+				ops.append((S_F, ('health',)))
+			health_divisor = 100.0 if 18 < version < 115 else None  # health in percents
+
+			# if version > 87:
+			# 	load_data m_dynamic_out_restrictions xr_vector<u16>
+			# 	load_data m_dynamic_in_restrictions  xr_vector<u16>
+
+			# if version > 94:
+			# 	killer_id = sr.read('H')
+
+			# if version > 115:
+			# 	game_death_time = sr.read('Q')
+
+			# CSE_ALifeTraderAbstract::STATE_Read
+			# if version < 108:
+			# 	sr.read('I')
+
+			# if version > 62:
+			# 	money = sr.read('I')
+
+			# if version > 75 and version < 98:
+			# 	sr.read('i')  # CSpecificCharacter::IndexToId
+			# elif version >= 98:
+			# 	specific_character = sr.read_string()
+
+			# if version > 77:
+			# 	trader_flags = sr.read('I')
+
+			# if version > 81 and version < 96:
+			# 	sr.read('i')  # CCharacterInfo::IndexToId
+			# elif version > 95:
+			# 	character_profile = sr.read_string()
+
+			# if version > 85:
+			# 	community_index = sr.read('i')
+
+			# if version > 86:
+			# 	rank, reputation = sr.read('ii')
+
+			# if version > 104:
+			# 	character_name
+
+			# # CSE_ALifeCreatureActor::STATE_Read
+			# if version > 91:
+			#	# CSE_PHSkeleton::STATE_Read
+			#	startup_animation = sr.read_string()
+			#	flags, source_id = sr.read('BH')
+			#	if flags & (1 << 2):  # flSavedData
+			#		# SPHBonesData::net_Load
+			# 		bones_mask, root_bone = sr.read('QH')
+			# 		sr.read('fff')
+			# 		sr.read('fff')
+			# 		bones_number = sr.read('H')
+			# 		for i in range(bones_number):
+			# 			sr.read('BBB')  # quaternion, quaternion, enabled
+			# if version > 88:
+			# 	holder_ID = sr.read('H')
+			return tuple(ops), health_divisor
+
 	class Update:
 
 		@classmethod
 		def CSE_ALifeCreatureActor(cls, sr: SequensorReader, version: int) -> dict:
 			# for version >= 21
 			ret = cls.CSE_ALifeCreatureAbstract(sr, version)
-			ret['mstate'] = sr.read('H')
-			ret['accel'] = sr.read('Hf')
-			ret['velocity'] = sr.read('Hf')
-			ret['radiation'] = sr.read('f')
-			ret['weapon'] = sr.read('B')
-			ret['num_items'] = sr.read('H')
+			ret['mstate'] = sr.read_struct(S_H)
+			ret['accel'] = sr.read_struct(S_HF)
+			ret['velocity'] = sr.read_struct(S_HF)
+			ret['radiation'] = sr.read_struct(S_F)
+			ret['weapon'] = sr.read_struct(S_B)
+			ret['num_items'] = sr.read_struct(S_H)
 			if ret['num_items'] == 1:
-				sr.read('Bfffffffffffffffffff')
+				sr.read_struct(S_B19F)
 			return ret
 
 		@classmethod
 		def CSE_ALifeCreatureAbstract(cls, sr: SequensorReader, version: int) -> dict:
 			ret = {}
-			ret['health'], ret['timestamp'], ret['flags'] = sr.read('fIB')
-			ret['position'] = sr.read('fff')
-			ret['model'], ret['yaw'], ret['pitch'], ret['roll'], ret['team'], ret['squad'], ret['group'] = sr.read('ffffBBB')
+			ret['health'], ret['timestamp'], ret['flags'] = sr.read_struct(S_FIB)
+			ret['position'] = sr.read_struct(S_FFF)
+			ret['model'], ret['yaw'], ret['pitch'], ret['roll'], ret['team'], ret['squad'], ret['group'] = sr.read_struct(S_4FBBB)
 			return ret
 
 		@classmethod
 		def CSE_ALifeItemAmmo(cls, sr: SequensorReader, version: int) -> dict:
 			# CSE_ALifeItemAmmo::UPDATE_Read
 			ret = cls.CSE_ALifeInventoryItem(sr, version)
-			ret['elapsed'] = sr.read('H')
+			ret['elapsed'] = sr.read_struct(S_H)
 			return ret
 
 		@classmethod
 		def CSE_ALifeInventoryItem(cls, sr: SequensorReader, version: int) -> dict:
 			# CSE_ALifeInventoryItem::UPDATE_Read
 			ret = {}
-			ret['num_items'] = sr.read('B')
+			ret['num_items'] = sr.read_struct(S_B)
 			if ret['num_items']:
 				# print(f'num_items={bin(ret['num_items'])}', sr.read_bytes(update_position=False).hex())
 				ret['num_items'], mask = ret['num_items'] & 0b1_1111, (ret['num_items'] >> 5) & 0b111
-				sr.read('fff')  # position
-				sr.read('BBBB')  # quaternion
+				sr.read_struct(S_FFF)  # position
+				sr.read_struct(S_4B)  # quaternion
 				if not (mask & 0b010):  # inventory_item_angular_null
-					sr.read('BBB')  # angular_vel
+					sr.read_struct(S_BBB)  # angular_vel
 				if not (mask & 0b100):  # inventory_item_linear_null
-					sr.read('BBB')  # linear_vel
+					sr.read_struct(S_BBB)  # linear_vel
 			return ret
 
 
@@ -368,6 +506,11 @@ Objects.NAMES = {
 	# Objects.Update.CSE_ALifePsyDogPhantom: ('psy_dog_phantom',),
 	# Objects.Update.CSE_ALifeItemArtefact: ('art_mercury_ball' , 'art_black_drops' , 'art_needles' , 'art_bast_artefact' , 'art_gravi_black' , 'art_dummy' , 'art_zuda' , 'art_thorn' , 'art_faded_ball' , 'art_electric_ball' , 'art_rusty_hair' , 'art_galantine' , 'art_gravi' , 'artefact', 'artefact_s'),
 	}
+# get_update() lookup: exact names and ordered name prefixes (names with trailing *)
+Objects.NAMES_EXACT = {name: Objects._find_update(name) for names in Objects.NAMES.values() for name in names if not name.endswith('*')}
+_prefixes = [(name[:-1], update) for update, names in Objects.NAMES.items() for name in names if name.endswith('*')]
+Objects.NAMES_PREFIX_RE = compile('|'.join(f'({escape(x)})' for x, _ in _prefixes)) if _prefixes else None
+Objects.NAMES_PREFIX_UPDATES = tuple(x for _, x in _prefixes)
 
 
 if __name__ == '__main__':
@@ -396,7 +539,7 @@ if __name__ == '__main__':
 				print(f'Chunk: offset={chunk.parent_pos}, length={chunk.size}')
 			for data in chunk.iter_data():
 				if not args.client_data:
-					print(type(chunk).__name__, data)
+					print(type(chunk).__name__, dict(data))
 				elif chunk.type == Save.ChunkTypes.OBJECT and data.get('id') == 0:
 					# binary dump of actor client_data
 					from sys import exit, stdout
@@ -3,15 +3,23 @@
 # Stalker Xray game .ltx and .xml files tool for actor tasks
 # Author: Stalker tools, 2023-2024
 
-from sys import stderr
+from sys import stderr, stdout, intern
+import csv
+from os import scandir
+from operator import itemgetter
 from os.path import join, basename
 from glob import glob
 from ltx_tool import parse_ltx_file, LtxKind
-from xml_tool import xml_preprocessor, get_child_element_values
-from xml.dom.minidom import Element
 from xml_tool import add_localization_dict_from_localization_xml_file
 
 
+CSV_QUOTE_TRANSLATE = str.maketrans({'"': '\''})  # csv cell text: replace double quotes
+FIELD_NAMES = ('No', 'Id', 'Name', 'Text', 'Task type', 'Faction', 'Reward money', 'Reward item')
+HTML_TABLE_HEAD = '<thead><tr>' + ''.join(f'<th>{x}</th>' for x in FIELD_NAMES) + '</tr></thead>'
+CSV_TABLE_HEAD = ','.join(FIELD_NAMES)
+LOCALIZED_TASK_VALUE_NAMES = frozenset(('name', 'text'))
+TASK_FILTER_NAMES_WITH_NAME_SUBSORT = frozenset(('task_type', 'faction'))
+
 def get_tasks_ltx_file_path(configs_path: str) -> str | None:
 	'returns path to task_manager.ltx file'
 	# try find tasks .ltx file
@@ -31,14 +39,20 @@ def get_tasks_and_add_localization(localization_dict: dict[str, str], configs_pa
 					if len(section) > 1:
 						sections[prev_section_name] = section
 					section = { '': section_parents }
-					prev_section_name = section_name
+					prev_section_name = intern(section_name)
 				case (LtxKind.LET, _, _, lval, rvals):
-					section[lval] = rvals if len(rvals) > 1 else rvals[0]
+					# interned values: localization ids lookups compare by identity
+					section[lval] = rvals if len(rvals) > 1 else intern(rvals[0])
 		if len(section) > 1:
 			sections[prev_section_name] = section
 
-		# add localization # find quest xml localization files
-		for localization_xml_file_path in glob(join(localization_text_path, 'st_quest*.xml')):
+		# add localization # find quest xml localization files: st_quest*.xml
+		try:
+			with scandir(localization_text_path) as it:
+				localization_xml_file_paths = [x.path for x in it if x.name.startswith('st_quest') and x.name.endswith('.xml')]
+		except OSError:
+			localization_xml_file_paths = []
+		for localization_xml_file_path in localization_xml_file_paths:
 			add_localization_dict_from_localization_xml_file(localization_dict, configs_path, localization_xml_file_path, verbose)
 
 		return sections
@@ -70,6 +84,10 @@ if __name__ == '__main__':
 
 		args = parse_args()
 
+		def write_html(text: str):
+			'writes encoded text directly to stdout binary buffer; pending print() output must be flushed before'
+			stdout.buffer.write(text.encode(stdout.encoding))
+
 		def analyse(gamedata_path: str):
 
 			configs_path = join(gamedata_path, 'configs')
@@ -77,31 +95,37 @@ if __name__ == '__main__':
 			localization_dict: dict[str, str] = {}  # localization string: id, text
 
 			if args.output_format != 'c':
-				print(f'<html>\n<head><title>{args.head}</title></head>')
-				print(f'<body>')
-				print(f'<h1>{args.head}</h1><hr/>')
+				# written before tasks load: localization files are listed after html head
+				stdout.write(f'<html>\n<head><title>{args.head}</title></head>\n<body>\n<h1>{args.head}</h1><hr/>\n')
 				STYLE_TEXT_LEFT = 'style="text-align: left;"'
 
 			tasks_sections_dict = get_tasks_and_add_localization(localization_dict, configs_path, localization_text_path, args.output_format != 'c')
 
-			def get_task_value(task: dict[str, object], value_name: str) -> str | None:
-				if value_name in task:
-					return task.get(value_name)
-				# try find value in parents sections
-				if (parents := task.get('')):
-					for parent in parents:
-						if (parent_task := tasks_sections_dict.get(parent)):
-							if (value := get_task_value(parent_task, value_name)) is not None:
-								return value
+			def get_task_sections(task: dict[str, object]) -> tuple[dict[str, object], ...]:
+				'returns task section and its parents sections in value lookup order (depth-first); each section once: parents cycles stopped'
+				ret, stack, seen = [], [task], set()
+				while stack:
+					if id(section := stack.pop()) in seen:
+						continue
+					seen.add(id(section))
+					ret.append(section)
+					if (parents := section.get('')):
+						stack.extend(x for parent in reversed(parents) if (x := tasks_sections_dict.get(parent)))
+				return tuple(ret)
+
+			# linearized parents sections: values lookup is a flat loop instead of recursion
+			tasks_sections = {task_id: get_task_sections(task) for task_id, task in tasks_sections_dict.items()} if tasks_sections_dict else {}
+
+			def get_task_value(task_id: str, value_name: str) -> str | None:
+				for section in tasks_sections[task_id]:
+					if value_name in section:
+						return section[value_name]
 				return None
 
-			LOCALIZED_TASK_VALUE_NAMES = ('name', 'text')
-			TASK_FILTER_NAMES_WITH_NAME_SUBSORT = ('task_type', 'faction')
-
 			def _get_section_value(task_id: str, task: dict[str, object], value_name: str) -> str | None:
 				if value_name == 'id':
 					return task_id
-				if (value := get_task_value(task, value_name)):
+				if (value := get_task_value(task_id, value_name)):
 					if value_name in LOCALIZED_TASK_VALUE_NAMES:
 						# try get localization
 						if (localized_value := localization_dict.get(value)):
@@ -110,64 +134,62 @@ if __name__ == '__main__':
 					return value
 				return ''
 
+			TABLE_VALUE_NAMES = ('id', 'name', 'text', 'task_type', 'faction', 'reward_money', 'reward_item')
+			# table values with parents sections lookup and localization done once per task
+			tasks_values = {task_id: {x: _get_section_value(task_id, task, x) for x in TABLE_VALUE_NAMES}
+				for task_id, task in tasks_sections_dict.items()} if tasks_sections_dict else {}
+
+			def get_section_value(task_id: str, task: dict[str, object], value_name: str) -> str | None:
+				'returns task value: table values resolved once per task'
+				if value_name in (values := tasks_values[task_id]):
+					return values[value_name]
+				return _get_section_value(task_id, task, value_name)
+
 			def _get_section_value_sort(task_id: str, task: dict[str, object], filter: str) -> str:
-				if (value := _get_section_value(task_id, task, filter)):
+				if (value := get_section_value(task_id, task, filter)):
 					if filter in TASK_FILTER_NAMES_WITH_NAME_SUBSORT:
 						return value + _get_section_value_sort(task_id, task, 'name')
 					value = str(value).lstrip()
-					return value if ord(value[0]) < 128 else ' ' + value
+					return value if value[:1].isascii() else ' ' + value
 				if filter in TASK_FILTER_NAMES_WITH_NAME_SUBSORT:
 					return _get_section_value_sort(task_id, task, 'name')
 				return ''
 
-			def add_section_value(task_id: str, task: dict[str, object], value_name: str, is_last = False):
-				buff = _get_section_value(task_id, task, value_name)
-				if args.output_format != 'c':
-					if type(buff) is tuple:
-						buff = '<br/>'.join(buff)
-					if value_name == 'reward_item':
-						buff = '<br/>'.join(buff.split(':'))
-					if value_name in LOCALIZED_TASK_VALUE_NAMES:
-						print(f'<th {STYLE_TEXT_LEFT}>{buff}</th>')
-					else:
-						print(f'<th>{buff}</th>')
-				else:
-					if type(buff) is tuple:
-						buff = ','.join(buff)
-					if type(buff) is str:
-						if '"' in buff:
-							buff = buff.replace('"', '\'')
-						buff = '"' + buff + '"'
-					print(buff, end='' if is_last else ',')
-
-			FILELD_NAMES = ('No', 'Id', 'Name', 'Text', 'Task type', 'Faction', 'Reward money', 'Reward item')
-
+			# table cell formats by value name; selected once per output format
 			if args.output_format != 'c':
-				print('<table border=1 style="border-collapse: collapse;">')
-				print(f'<thead><tr>{"".join(("<th>"+x+"</th>" for x in FILELD_NAMES))}</tr></thead>')
-				print('<tbody>')
+				CELL_VALUES_SEPARATOR = '<br/>'
+				cell_formats = {x: (f'<th {STYLE_TEXT_LEFT}>{{}}</th>' if x in LOCALIZED_TASK_VALUE_NAMES else '<th>{}</th>').format for x in TABLE_VALUE_NAMES}
+				cell_formats['reward_item'] = lambda x: f'<th>{x.replace(":", "<br/>")}</th>'
 			else:
-				print(f'{",".join((x for x in FILELD_NAMES))}')
+				CELL_VALUES_SEPARATOR = ','
+				cell_formats = dict.fromkeys(TABLE_VALUE_NAMES, lambda x: x.translate(CSV_QUOTE_TRANSLATE))
+
+			def get_section_cell(task_id: str, value_name: str) -> str:
+				'returns table cell text'
+				if isinstance(buff := tasks_values[task_id][value_name], tuple):
+					buff = CELL_VALUES_SEPARATOR.join(buff)
+				return cell_formats[value_name](buff)
+
+			rows = []
 			if tasks_sections_dict:
-				for index, task_id_and_values in enumerate(sorted(tasks_sections_dict.items(), key=lambda x:
-						_get_section_value_sort(*x, args.sort_field))):
-					match args.output_format:
-						case 'h':
-							print('<tr>')
-							print(f'<th>{index + 1}</th>')
-						case 'c':
-							print(f'{index + 1}', end=',')
-					add_section_value(*task_id_and_values, 'id')
-					add_section_value(*task_id_and_values, 'name')
-					add_section_value(*task_id_and_values, 'text')
-					add_section_value(*task_id_and_values, 'task_type')
-					add_section_value(*task_id_and_values, 'faction')
-					add_section_value(*task_id_and_values, 'reward_money')
-					add_section_value(*task_id_and_values, 'reward_item', True)
-					print('</tr>' if args.output_format != 'c' else '')
-			if args.output_format == 'h':
-				print('</tbody></table>')
-				print('</body>\n</html>')
+				# sort key built once per task
+				decorated = [(_get_section_value_sort(task_id, task, args.sort_field), task_id, task) for task_id, task in tasks_sections_dict.items()]
+				decorated.sort(key=itemgetter(0))
+				for index, (_, task_id, task) in enumerate(decorated):
+					cells = [get_section_cell(task_id, x) for x in TABLE_VALUE_NAMES]
+					if args.output_format != 'c':
+						rows.append('\n'.join(('<tr>', f'<th>{index + 1}</th>', *cells, '</tr>\n')))
+					else:
+						rows.append((index + 1, *cells))
+			# write table at once
+			if args.output_format != 'c':
+				stdout.flush()
+				write_html(''.join(('<table border=1 style="border-collapse: collapse;">\n', HTML_TABLE_HEAD, '\n<tbody>\n', *rows,
+					'</tbody></table>\n</body>\n</html>\n' if args.output_format == 'h' else '')))
+			else:
+				stdout.write(CSV_TABLE_HEAD + '\n')
+				# csv: quote text cells only
+				csv.writer(stdout, lineterminator='\n', quoting=csv.QUOTE_NONNUMERIC).writerows(rows)
 
 		analyse(args.gamedata)
 
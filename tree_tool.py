@@ -73,9 +73,17 @@ if __name__ == '__main__':
 
 		def analyse(gamedata_path: str):
 
+			node_attributes: dict[int, dict[str, object]] = {}  # level: node style attributes
+
+			def get_node_attributes(level: int) -> dict[str, object]:
+				'returns node style attributes; built once per level'
+				if (ret := node_attributes.get(level)) is None:
+					node_attributes[level] = ret = dict(fontsize=style.node.get_fontsize(level), height=style.node.get_height(level),
+						penwidth=style.node.penwidth, shape=style.node.shape, color=style.node.color, fontcolor=style.node.color)
+				return ret
+
 			def add_node(level, name: str, parent_name: str | None = None, label: str | None = None) -> tuple['Node', 'Edge | None']:
-				node = pydot.Node(name, label=label if label else name, fontsize=style.node.get_fontsize(level), height=style.node.get_height(level),
-					penwidth=style.node.penwidth, shape=style.node.shape, color=style.node.color, fontcolor=style.node.color)
+				node = pydot.Node(name, label=label if label else name, **get_node_attributes(level))
 				graph.add_node(node)
 
 				if parent_name:
@@ -88,22 +96,30 @@ if __name__ == '__main__':
 
 				return node, None
 
+			ltx_includes: dict[str, tuple[str, ...] | None] = {}  # .ltx file path: include file paths, None for missing file
+
+			def get_ltx_includes(ltx_path: str) -> tuple[str, ...] | None:
+				'returns .ltx file include file paths; file parsed once for all includers'
+				if ltx_path not in ltx_includes:
+					try:
+						ltx_includes[ltx_path] = tuple(x[2] for x in parse_ltx_file(ltx_path) if x[0] == LtxKind.INCLUDE)
+					except LtxFileNotFoundException:
+						ltx_includes[ltx_path] = None
+				return ltx_includes[ltx_path]
+
 			def buid_ltx_include_tree(ltx_file_path, level=0, parent_name: str | None = None):
 				# print(f'{ltx_file_path=} {parent_name=}')
 				path = split(ltx_file_path)[0]
 				ltx_path = join(configs_path, ltx_file_path)
 				ltx_path_print = 'configs/' + ltx_file_path
 				node, edge = add_node(level, ltx_path_print, parent_name)
-				try:
-					for x in parse_ltx_file(ltx_path):
-						match x[0]:
-							case LtxKind.INCLUDE:
-								_, include_file_path = x[1], x[2]
-								buid_ltx_include_tree(join(path, include_file_path), level + 1, ltx_path_print)
-				except LtxFileNotFoundException:
+				if (include_file_paths := get_ltx_includes(ltx_path)) is None:
 					node.set_label(f'{node.get_label()} (missing)')
 					node.set_color(style.node.color_missing)
 					edge.set_color(style.node.color_missing)
+					return
+				for include_file_path in include_file_paths:
+					buid_ltx_include_tree(join(path, include_file_path), level + 1, ltx_path_print)
 
 			match args.style.lower():
 				case 'l':
@@ -12,7 +12,7 @@
 	<div class="item">
 		<div style="display:flex;align-items:flex-start;">
 			<span class="item-header">
-				{{datetime.fromtimestamp(gs.file_time, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')}}
+				{{datetime.fromtimestamp(gs.file_time / 1e9, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')}}
 				<br/>
 				{{gs.name}}
 				<br/>
@@ -12,7 +12,7 @@
 		<br/>
 		<h3>{{gs.map_name_localized}}</h3>
 		<br/>Здоровье {{f'{gs.health * 100:.0f}'}}%
-		<br/>{{datetime.fromtimestamp(gs.file_time, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')}}
+		<br/>{{datetime.fromtimestamp(gs.file_time / 1e9, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')}}
 	</td>
 	<td style="text-align:center"><a href="/save/{{gs.name}}"><img src="/mapimg/{{gs.name}}?s=0.2"></img></a></td>
 </tr>
@@ -11,22 +11,27 @@
 
 from typing import Callable, Iterator
 from dataclasses import dataclass
+from functools import lru_cache
 from sys import exit, path
-from time import sleep, monotonic
+from time import monotonic
+from os import scandir
 from os.path import getctime
 from pathlib import Path
 from io import BytesIO
 from email.utils import formatdate, parsedate_tz, mktime_tz
-from threading import Thread, Lock
+from threading import Thread, Lock, Event
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIServer
 from bottle import route, view, run, static_file, response, request
 import qrcode
-from PIL.Image import open as image_open, Image
+from PIL.Image import open as image_open, Image, Resampling
 from PIL.ImageDraw import Draw
 # tools imports
 web_module_path = Path(__file__).parent.absolute()
 path.append(str(web_module_path.parent.absolute()))  # add tools modules path
 from Game import Game, DEFAULT_FSGAME_FILE_NAME, DEFAULT_ODYSSEY_CONFIG_FILE_NAME
 from ltx_tool import Ltx
+from save_tool import Save
 from Odyssey import Odyssey, MapChanged
 
 
@@ -38,6 +43,13 @@ DEFAULT_BLACK_STYLE = True
 DEFAULT_IMG_FORMAT = 'webp'  # MIME image type (see https://developer.mozilla.org/en-US/docs/Web/HTTP/MIME_types)
 DEFAULT_SAVED_GAMES_CACHE_REFRESH_TIME = 5  # seconds
 TEMPLATES_LOOKUP = (str(web_module_path),)  # .tpl files paths
+API_XML_EMPTY = b'<odyssey></odyssey>'  # /api response: no event
+API_XML_AUDIO = b'<odyssey><audio href="/profiles/static/%s"/></odyssey>'  # /api response: radio audio file name
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+	'bottle default wsgiref server with request per thread: slow image request does not block others'
+	daemon_threads = True
+
 
 def map_name_convert(map_name: str) -> str:
 	'converts game.graph level name to simple map name'
@@ -66,40 +78,37 @@ class WebGame(Game):
 
 	class PeriodicTimer:
 		'periodically runs callback on separate thread'
+		__slots__ = ('callback', 'time_delta', '_stop', 'thread', 'lock', 'inited', 'has_all')  # lock, inited, has_all: callback state
 
 		def __init__(self, callback: Callable, time_delta: int):
 			self.callback, self.time_delta = callback, int(time_delta)
 			if self.time_delta == 0:
 				raise ValueError(f'time_delta must be int and > 0: {self.time_delta}')
-			self._stop, self._remain = False, 0
-			self.thread = Thread(target=self._run)
+			self._stop = Event()  # set to stop timer; wakes waiting timer thread at once
+			self.thread = Thread(target=self._run, daemon=True)
 
 		def start(self):
-			self._stop = False
+			self._stop.clear()
 			self.thread.start()
 
 		def _run(self):
-			while not self._stop:
-				if self._remain > 0:
-					self._remain -= 1
-					sleep(1.0)
-					continue
-				self._remain = self.time_delta
+			while not self._stop.is_set():
 				# timer tick
 				self.callback(self)
 				# print(f'{monotonic():0.6f} !!! timer tick: sleep {self.time_delta} s')
+				self._stop.wait(self.time_delta)
 
 		def stop(self):
-			self._stop = True
+			self._stop.set()
 			self.thread.join()
 
 
-	@dataclass
+	@dataclass(frozen=True, slots=True)
 	class GameSave:
 		'game save .sav file cache'
 		name: str  # .sav file name stem (see Path)
 		file_path: str  # .sav path
-		file_time: float  # .sav file time
+		file_time: int  # .sav file ctime, ns: exact integer compare
 		map_name: str  # map (level) name
 		map_name_localized: str  # map localized name
 		health: float  # actor health
@@ -109,13 +118,16 @@ class WebGame(Game):
 	# Odyssey event data classes
 
 
-	@dataclass
+	@dataclass(slots=True)
 	class WebMapChanged(MapChanged):
 		gs: 'WebGame.GameSave'
 		def iter_actor_objects(self, actor_only=False) -> Iterator[dict]:
-			yield from game.iter_save_actor_objects(self.gs.file_path, actor_only)
+			objects = game.get_save_actor_objects(self.gs)
+			if actor_only:
+				objects = next(((x,) for x in objects if x.get('id') == 0), ())
+			yield from objects
 		def has_actor_object(self, name: str) -> bool:
-			return game.has_save_actor_object(self.gs.file_path, name)
+			return any((x for x in game.get_save_actor_objects(self.gs) if x.get('name') == name))
 
 
 	# Web Game methods
@@ -128,7 +140,9 @@ class WebGame(Game):
 			raise self.MapsNotFoundError()
 		self.global_map_name = self.config.maps.global_map.name
 		# load game savings .sav files
+		self._savings_path = str(self.savings_path.absolute())  # .sav files absolute path: resolved once for timer ticks
 		self._savings_cache: tuple['GameSave'] = tuple()
+		self._save_actor_objects: dict[tuple[str, int], tuple[Save.ObjectData]] = {}  # (.sav path, .sav file time): actor objects
 		self._savings_cache_timer = self.PeriodicTimer(self._update_savings, DEFAULT_SAVED_GAMES_CACHE_REFRESH_TIME)
 		self._savings_cache_timer.lock = Lock()  # savings cache lock
 		self._savings_cache_timer.inited = False  # is a savings change detection inited
@@ -147,6 +161,19 @@ class WebGame(Game):
 		with self._savings_cache_timer.lock:
 			return self._savings_cache
 
+	def get_save_actor_objects(self, gs: GameSave) -> tuple[Save.ObjectData]:
+		'''returns .sav file actor and belongs to actor objects; .sav file parsed once per file time
+		Called by request threads: cache accessed under savings cache lock, .sav file parsed outside of it'''
+		key = (gs.file_path, gs.file_time)
+		with self._savings_cache_timer.lock:
+			if (ret := self._save_actor_objects.get(key)) is not None:
+				return ret
+		ret = tuple(self.iter_save_actor_objects(gs.file_path))  # parse without lock: timer thread not blocked
+		with self._savings_cache_timer.lock:
+			if gs in self._savings_cache:  # not cache removed .sav file: remove_files() evicts live ones only
+				ret = self._save_actor_objects.setdefault(key, ret)
+		return ret
+
 	def _update_savings(self, timer: PeriodicTimer):
 		'''updates game savings cache
 		Used to Xray .sav files and Odyssey synchronize
@@ -168,12 +195,6 @@ class WebGame(Game):
 				return map_name, self.localize(map_name)
 			return None
 
-		def get_cached_file(file_path: str) -> 'GameSave | None':
-			for sc in self._savings_cache:
-				if sc.file_path == file_path:
-					return sc
-			return None
-
 		def print_files(files: 'tuple[GameSave]', title: str):
 			if files:
 				max_name = max((len(x.name) for x in files))
@@ -189,21 +210,23 @@ class WebGame(Game):
 				buff = list(self._savings_cache)
 				for gs in files:
 					buff.remove(gs)
+					self._save_actor_objects.pop((gs.file_path, gs.file_time), None)
 				self._savings_cache = tuple(buff)
 
 		add_files = changed_files = None
 		has_all = False
 		# print(f'B {timer.inited=} {timer.has_all=}')
 		with timer.lock:
-			removed_files = list(self._savings_cache)
-			for sav_file in self.savings_path.glob('*.sav'):  # find .sav files
-				if sav_file.stem.lower() == 'all':
+			removed_files = {x.file_path: x for x in self._savings_cache}  # cached files by path: not found ones are removed
+			with scandir(self._savings_path) as it:
+				sav_files = [x for x in it if x.name.endswith('.sav')]  # find .sav files
+			for sav_file in sav_files:
+				if (sav_file_stem := sav_file.name[:-4]).lower() == 'all':
 					has_all = True
 				else:
-					abs_path = sav_file.absolute()
-					file_time = getctime(abs_path)
-					if (cached_file := get_cached_file(abs_path)):
-						removed_files.remove(cached_file)
+					abs_path = sav_file.path
+					file_time = sav_file.stat().st_ctime_ns  # Linux: stat syscall per entry; only is_dir()/is_file() come from scandir
+					if (cached_file := removed_files.pop(abs_path, None)):
 						if cached_file.file_time == file_time:
 							continue  # file not changed
 						# file was updated
@@ -213,9 +236,9 @@ class WebGame(Game):
 					# there is file that missing in cache
 					if not add_files:
 						add_files = []
-					for data in self.iter_save_actor_objects(abs_path):  # parse .sav file and iterate actor objects
+					for data in self.iter_save_actor_objects(abs_path, True):  # parse .sav file up to actor object
 						if data.get('id') == 0:
-							add_files.append(self.GameSave(sav_file.stem, abs_path, file_time,
+							add_files.append(self.GameSave(sav_file_stem, abs_path, file_time,
 								# *get_level_from_actor_client_data(data.get('client_data')) or ('', ''),
 								*get_level_from_graph_vertex(data.get('graph_id')) or ('', ''),
 								data.get('health', 1.0), data.get('position')))
@@ -224,7 +247,9 @@ class WebGame(Game):
 			if add_files:
 				print_files(add_files, 'ADD')
 				add_files.extend(self._savings_cache)
-				self._savings_cache = tuple(sorted(add_files, key=lambda x: x.file_time))
+				add_files.sort(key=lambda x: x.file_time)
+				self._savings_cache = tuple(add_files)
+			removed_files = tuple(removed_files.values())
 			remove_files(removed_files, 'REMOVE')
 		if has_all != timer.has_all:
 			timer.has_all = has_all
@@ -282,7 +307,7 @@ class WebGame(Game):
 			print(f'Audio for radio profile file not correct: {file_path}')
 
 
-@dataclass
+@dataclass(slots=True)
 class ActorObject:
 	'.sav file object that belongs to actor. Used as cache to render web interface'
 	object: dict[str, str]  # .sav file object
@@ -376,22 +401,18 @@ def profiles_audio():
 	if (file_path := game.radio_audio):
 		# set mime type
 		if (mime := game.get_media_file_mime(file_path)):
-			response.headers['Content-Type'] = mime
 			game.radio_audio = None  # send only once
-			# send audio file
-			with open(file_path, 'rb') as f:
-				return f.read()
+			# send audio file: streamed from file by server, not read to memory
+			return static_file(file_path.name, str(file_path.parent), mimetype=mime)
 	response.status = 404
 	return None
 
 @route('/api')
 def api():
 	response.headers['Content-Type'] = 'application/xml'
-	ret = '<odyssey>'
-	if game.radio_audio:
-		ret += f'<audio href="/profiles/static/{game.radio_audio.name if game.radio_audio else ''}"/>'
-	ret += '</odyssey>'
-	return ret
+	if (radio_audio := game.radio_audio):
+		return API_XML_AUDIO % radio_audio.name.encode()
+	return API_XML_EMPTY
 
 # web game API
 
@@ -404,26 +425,35 @@ def get_save(save_name: str) -> WebGame.GameSave | None:
 def send_img_from_file(image_file_path: str, default_reduce = 2, gs: WebGame.GameSave | None = None):
 	'sends image with client side cache ability: HTTP 304'
 	if image_file_path:
-		if (image_file_ctime := int(getctime(image_file_path) or None)):
+		image_file_time = getctime(image_file_path)
+		if (image_file_ctime := int(image_file_time or None)):
 			response.headers['Last-Modified'] = formatdate(image_file_ctime, usegmt=True)
 		if (if_modified_since := request.headers.get('If-Modified-Since')):
 			if image_file_ctime == mktime_tz(parsedate_tz(if_modified_since)):
 				response.status = 304
 				return None
-		image = image_open(image_file_path)
-		if gs:
-			# add actor position from save
-			mark_map_position(gs, image)
-		return send_img(image, default_reduce)
+		response.content_type = f'image/{DEFAULT_IMG_FORMAT}'
+		return get_img_from_file(str(image_file_path), image_file_time, get_img_reduce(default_reduce),
+			(gs.map_name, tuple(gs.position) if gs.position else None) if gs else None)
 	response.status = 404
 	return None
 
+@lru_cache(maxsize=128)
+def get_img_from_file(image_file_path: str, image_file_time: float, reduce: float, map_position: tuple[str, tuple[float, float, float] | None] | None) -> bytes:
+	'''returns encoded image from file with actor position mark (if any)
+	Cached by file time: changed image file is encoded again'''
+	image = image_open(image_file_path)
+	if map_position:
+		# add actor position from save
+		mark_map_position(*map_position, image)
+	return get_img_bytes(image, reduce)
+
 def iter_actor_objects(gs: WebGame.GameSave | None) -> Iterator[ActorObject]:
 	'iterate actor object from .sav file with sorting by .ltx class'
 	if gs:
 		objects: dict[str, ActorObject] = {}  # because quantity need to be aggregated
 		# aggregate the object quantity with the same .ltx section
-		for object in game.iter_save_actor_objects(gs.file_path):
+		for object in game.get_save_actor_objects(gs):
 			if (name := object.get('name')):
 				if name in objects:
 					objects[name].quantity += object.get('elapsed', 1)
@@ -433,11 +463,10 @@ def iter_actor_objects(gs: WebGame.GameSave | None) -> Iterator[ActorObject]:
 		for object in sorted(objects.values(), key=lambda x: x.section.get('class') if x.section else ''):
 			yield object
 
-def mark_map_position(gs: WebGame.GameSave, img: Image) -> Image:
+def mark_map_position(map_name: str, pos: tuple[float, float, float] | None, img: Image) -> Image:
 	'modifies map image: add marked point from save'
 	POINT_SIZE, POINT_COLOR, POINT_COLOR2 = 14, 'red', 'yellow'
-	pos = gs.position
-	if pos and len(pos) == 3 and img and (section := game.config.maps.get_map_section(gs.map_name)):  # check args
+	if pos and len(pos) == 3 and img and (section := game.config.maps.get_map_section(map_name)):  # check args
 		if (bound_rect := section.get('bound_rect')) and len(bound_rect) == 4:  # get map rect
 			# calc map to image scale
 			bound_rect = tuple(map(float, bound_rect))
@@ -458,15 +487,18 @@ def get_img_reduce(default_reduce = 2):
 	except: pass
 	return default_reduce
 
-def send_img(image: Image, default_reduce = 2):
-	'default_reduce: image resize koef.'
+def get_img_bytes(image: Image, reduce: float) -> bytes:
+	'returns encoded image; reduce: image resize koef.'
 	buff = BytesIO()
-	reduce = get_img_reduce(default_reduce)
-	image = image.resize(tuple(map(lambda x: int(x * reduce), image.size)))
+	if (size := tuple(map(lambda x: int(x * reduce), image.size))) != image.size:
+		image = image.resize(size, Resampling.BILINEAR)
 	image.save(buff, format=DEFAULT_IMG_FORMAT)
-	buff.seek(0)
+	return buff.getvalue()
+
+def send_img(image: Image, default_reduce = 2):
+	'default_reduce: image resize koef.'
 	response.content_type = f'image/{DEFAULT_IMG_FORMAT}'
-	return buff.read()
+	return get_img_bytes(image, get_img_reduce(default_reduce))
 
 # command line API
 
@@ -515,8 +547,8 @@ if __name__ == '__main__':
 
 		# run web server
 		# run(host=args.address, port=args.port, reloader=args.debug, debug=args.debug)
-		t = Thread(target=run, kwargs=dict(host=args.address, port=args.port, reloader=False, debug=args.debug))
-		t.run()
+		# server runs on main thread to stop by Ctrl+C; requests served by threads
+		run(host=args.address, port=args.port, reloader=False, debug=args.debug, server_class=ThreadingWSGIServer)
 		if args.debug:
 			print('\tWaiting while all threads stopped')
 		try:
@@ -4,46 +4,119 @@
 # Since .xml files break W3C XML rules
 # Author: Stalker tools, 2023-2024
 
-from sys import stderr
+from sys import stderr, intern
 from io import BytesIO
-from os import sep as path_separator
+from os import sep as path_separator, stat
+from re import compile, MULTILINE
+from collections import OrderedDict
+from threading import Lock
 from os.path import join, basename, split
-from xml.dom.minidom import parseString, Element, Document
+from xml.dom.minidom import parseString, Element, Document, Node
+from xml.etree import ElementTree
 
 
-def xml_preprocessor(xml_file_path: str, include_base_path: str | None = None, included = False, failed_include_file_paths: list[str] = None) -> bytes:
+PATH_SEPARATOR_BYTES = path_separator.encode()
+PATH_SEPARATOR_FIX = PATH_SEPARATOR_BYTES != b'\\'  # .xml include paths use Windows path splitter
+INCLUDE_DIRECTIVE_LEN = len(b'#include')
+# preprocessor lines to process: #include, comment; and <?xml for included document
+XML_PREPROCESSOR_LINE_RE = compile(rb'^[ \t\r\v\f]*(?:(#include)|<!--)[^\n]*\n?', MULTILINE)
+XML_PREPROCESSOR_INCLUDED_LINE_RE = compile(rb'^(?:[ \t\r\v\f]*(?:(#include)|<!--)|<\?xml)[^\n]*\n?', MULTILINE)
+XML_PREPROCESSOR_INCLUDED_CACHE_SIZE = 1024  # preprocessed included .xml files cache max entries count
+
+_failed_include_file_paths_lock = Lock()  # see xml_preprocessor() failed_include_file_paths
+
+def xml_preprocessor(xml_file_path: str, include_base_path: str | None = None, included = False, failed_include_file_paths: set[str] | None = None) -> bytes:
 	'''features:
 		- process #include to include text from another .xml files
 		- removes comments <!-----> since they break W3C XML rules
 		- removes <?xml tags in included documents since they break W3C XML rules
 	'''
+	missing_include_file_paths = []  # nested includes too: reported same way for cached included files
+	ret = b''.join(_xml_preprocessor_chunks(xml_file_path, include_base_path, included, missing_include_file_paths, {}))
+	for include_file_path in missing_include_file_paths:
+		if failed_include_file_paths is not None:
+			with _failed_include_file_paths_lock:  # same set may be shared by threads: check and add at once
+				if include_file_path in failed_include_file_paths:
+					continue
+				failed_include_file_paths.add(include_file_path)
+		print(f'include file not found: {include_file_path}', file=stderr)
+	return ret
 
-	buff = BytesIO()
+def _xml_preprocessor_chunks(xml_file_path: str, include_base_path: str | None, included: bool, missing_include_file_paths: list[str],
+		mtimes: dict[str, int | None], depends: dict[str, int | None] | None = None) -> list[bytes | memoryview]:
+	'''returns preprocessed .xml file text chunks; text copied once by final join
+	Lines to process found by regex scan of whole file; text between them kept as file buffer views
+	missing_include_file_paths: collects not found include files paths (nested ones too)
+	mtimes: files modification times, ns, got during top-level xml_preprocessor() call: each file stat once per call
+	depends: collects included files (nested ones too) modification times, ns; None for not found file'''
+	ret = []
 	with open(xml_file_path, 'rb') as f:
-		for line in f.readlines():
-			line_stripped = line.lstrip()
-			if line_stripped.startswith(b'#include'):
-				# include .xml file
-				line_stripped = line_stripped[len(b'#include') + 1:].strip(b' \t\r\n').strip(b'"')
-				line_stripped = line_stripped.replace(b'\\', path_separator.encode())  # convert path splitter to ext filesystem
-				include_file_path = join(include_base_path if include_base_path else split(xml_file_path)[0], line_stripped.decode())
-				try:
-					buff.write(xml_preprocessor(include_file_path, include_base_path, True))
-				except FileNotFoundError:
-					if failed_include_file_paths is not None:
-						if include_file_path in failed_include_file_paths:
-							continue
-						failed_include_file_paths.append(include_file_path)
-					print(f'include file not found: {include_file_path}', file=stderr)
-			elif line_stripped.startswith(b'<!--'):
+		buff = f.read()
+	view, pos = memoryview(buff), 0
+	for m in (XML_PREPROCESSOR_INCLUDED_LINE_RE if included else XML_PREPROCESSOR_LINE_RE).finditer(buff):
+		if pos < (start := m.start()):
+			ret.append(view[pos:start])
+		pos = m.end()
+		if m.group(1):
+			# include .xml file
+			line_stripped = m.group().lstrip()[INCLUDE_DIRECTIVE_LEN + 1:].strip(b' \t\r\n').strip(b'"')
+			if PATH_SEPARATOR_FIX:
+				line_stripped = line_stripped.replace(b'\\', PATH_SEPARATOR_BYTES)  # convert path splitter to ext filesystem
+			include_file_path = join(include_base_path if include_base_path else split(xml_file_path)[0], line_stripped.decode())
+			try:
+				include_text, include_depends, include_missing = _xml_preprocessor_included(include_file_path, include_base_path, mtimes)
+			except FileNotFoundError:
+				missing_include_file_paths.append(include_file_path)
+				if depends is not None:
+					depends[include_file_path] = None
 				continue
-			elif included and line.startswith(b'<?xml'):
-				continue
-			else:
-				buff.write(line)
-	return buff.getvalue()
+			ret.append(include_text)
+			missing_include_file_paths.extend(include_missing)
+			if depends is not None:
+				depends.update(include_depends)
+		# else: comment or <?xml line skipped
+	if pos < len(buff):
+		ret.append(view[pos:])
+	return ret
 
-def xml_parse(xml_file_path: str, include_base_path: str | None = None, included = False, failed_include_file_paths: list[str] = None) -> Document:
+def _get_mtime_ns(file_path: str, mtimes: dict[str, int | None]) -> int | None:
+	'returns file modification time, ns; None if file not found; stat once per mtimes dict'
+	if file_path in mtimes:
+		return mtimes[file_path]
+	try:
+		ret = stat(file_path).st_mtime_ns
+	except FileNotFoundError:
+		ret = None
+	mtimes[file_path] = ret
+	return ret
+
+# included .xml file (path, include base path): text, included files closure modification times, not found includes; least recently used first
+_xml_preprocessor_included_cache: OrderedDict[tuple[str, str | None], tuple[bytes, tuple[tuple[str, int | None], ...], tuple[str, ...]]] = OrderedDict()
+_xml_preprocessor_included_cache_lock = Lock()  # profiles .xml files preprocessed concurrently
+
+def _xml_preprocessor_included(xml_file_path: str, include_base_path: str | None, mtimes: dict[str, int | None]) -> tuple[bytes, tuple[tuple[str, int | None], ...], tuple[str, ...]]:
+	'''returns preprocessed included .xml file text, modification times of it and all files it includes and not found include files paths
+	Cached since same files included many times; cache entry valid while none of these files changed
+	Text stored joined: cache not holds whole source files buffers'''
+	key = (xml_file_path, include_base_path)
+	with _xml_preprocessor_included_cache_lock:
+		if (ret := _xml_preprocessor_included_cache.get(key)):
+			_xml_preprocessor_included_cache.move_to_end(key)
+	if ret and all(_get_mtime_ns(path, mtimes) == mtime_ns for path, mtime_ns in ret[1]):
+		return ret
+	if (mtime_ns := _get_mtime_ns(xml_file_path, mtimes)) is None:
+		raise FileNotFoundError(xml_file_path)
+	depends, missing_include_file_paths = {xml_file_path: mtime_ns}, []
+	text = b''.join(_xml_preprocessor_chunks(xml_file_path, include_base_path, True, missing_include_file_paths, mtimes, depends))
+	ret = (text, tuple(depends.items()), tuple(missing_include_file_paths))
+	with _xml_preprocessor_included_cache_lock:
+		_xml_preprocessor_included_cache[key] = ret
+		_xml_preprocessor_included_cache.move_to_end(key)
+		if len(_xml_preprocessor_included_cache) > XML_PREPROCESSOR_INCLUDED_CACHE_SIZE:
+			_xml_preprocessor_included_cache.popitem(last=False)
+	return ret
+
+def xml_parse(xml_file_path: str, include_base_path: str | None = None, included = False, failed_include_file_paths: set[str] | None = None) -> Document:
 	'''features:
 		- process #include to include text from another .xml files
 		- removes comments <!-----> since they break W3C XML rules
@@ -53,22 +126,70 @@ def xml_parse(xml_file_path: str, include_base_path: str | None = None, included
 	return parseString(buff)
 
 def iter_child_elements(element: Element):
-	for e in (x for x in element.childNodes if type(x) == Element):
-		yield e
+	'yields direct child elements; sibling links walk with integer node type check'
+	e = element.firstChild
+	while e is not None:
+		if e.nodeType == Node.ELEMENT_NODE:
+			yield e
+		e = e.nextSibling
 
-def get_child_by_id(element: Element, child_name: str, id: str) -> Element | None:
-	for e in element.getElementsByTagName(child_name):
+def iter_elements_by_tag_name(element: Element, name: str):
+	'getElementsByTagName() as generator: yields descendant elements in document order without building the whole list'
+	stack = [element.firstChild]
+	while stack:
+		e = stack.pop()
+		while e is not None:
+			if e.nodeType == Node.ELEMENT_NODE:
+				if e.tagName == name:
+					yield e
+				if e.firstChild is not None:
+					stack.append(e.nextSibling)
+					e = e.firstChild
+					continue
+			e = e.nextSibling
+
+def get_child_by_id(element: Element, child_name: str, id: str, children_by_id: dict[str, Element] | None = None) -> Element | None:
+	'children_by_id: get_children_by_id() index of element to avoid subtree walk for every lookup'
+	if children_by_id is not None:
+		return children_by_id.get(id)
+	for e in iter_elements_by_tag_name(element, child_name):
 		if (e_id := e.getAttribute('id')) and e_id == id:
-			return e
+			return e  # stop subtree walk on first match
 	return None
 
-def get_child_element_values(element: Element, child_name: str, join_str: str | None = None) -> list[str] | str:
-	ret = []
+def get_children_by_id(element: Element, child_name: str) -> dict[str, Element]:
+	'returns child elements index by id (first one for duplicated id); build it once for many get_child_by_id() lookups'
+	ret = {}
 	for e in element.getElementsByTagName(child_name):
-		if (e := e.firstChild):
-			ret.append(e.nodeValue)
+		if (e_id := e.getAttribute('id')) and e_id not in ret:
+			ret[e_id] = e
+	return ret
+
+def get_child_element_values(element: Element, child_name: str, join_str: str | None = None) -> list[str] | str:
+	ret = [text.nodeValue for e in element.getElementsByTagName(child_name) if (text := e.firstChild) is not None]
 	return join_str.join(ret) if join_str is not None else ret
 
+def get_child_element_texts(element: ElementTree.Element, child_name: str, join_str: str | None = None) -> list[str] | str:
+	'ElementTree version of get_child_element_values()'
+	ret = [e.text for e in element.iterfind(f'.//{child_name}') if e.text is not None]
+	return join_str.join(ret) if join_str is not None else ret
+
+def add_localization_dict_from_localization_xml_file(localization_dict: dict[str, str], include_base_path: str | None, xml_file_path: str, verbose = False) -> bool:
+	'adds localization strings from string_table .xml file to dict: id, text; streaming parse'
+	ret = False
+	try:
+		for _, e in ElementTree.iterparse(BytesIO(xml_preprocessor(xml_file_path, include_base_path))):
+			if e.tag == 'string':
+				if (string_id := e.get('id')):
+					localization_dict[intern(string_id)] = get_child_element_texts(e, 'text', '\n').replace('\\n', '\n')
+					ret = True
+				e.clear()
+	except (OSError, ElementTree.ParseError) as e:
+		print(f'Localization .xml file parse error: {xml_file_path} {e}', file=stderr)
+	if verbose and ret:
+		print(f'<p><code>Localization: {basename(xml_file_path)}</code></p>')
+	return ret
+
 
 if __name__ == '__main__':
 	import argparse